@@ -0,0 +1,50 @@
+import pickle
+import sys
+import unittest
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+ROOT = Path(__file__).parents[1]
+
+sys.path.insert(0, str(ROOT / "workflow" / "scripts" / "python"))
+
+import common.config as cfg  # noqa: E402
+
+CONFIGS = [ROOT / "config" / p for p in ["testing.yml", "testing-full.yml"]]
+
+ALL_PROPERTIES = [
+    n
+    for n in dir(cfg.GiabStrats)
+    if n.startswith("all_") and isinstance(getattr(cfg.GiabStrats, n), property)
+]
+
+
+def read_all(c: cfg.GiabStrats) -> dict[str, Any]:
+    return {n: getattr(c, n) for n in ALL_PROPERTIES}
+
+
+class TestPickle(unittest.TestCase):
+    def test_pickle_after_all_properties(self) -> None:
+        """The config must still pickle (as snakemake does for each script job)
+        after its memos have been filled."""
+        for path in CONFIGS:
+            with self.subTest(config=path.name):
+                c = cfg.GiabStrats.parse_obj(yaml.safe_load(path.read_text()))
+                before = read_all(c)
+                for rk, bk in c.all_full_ref_and_build_keys:
+                    c.to_build_data_full(rk, bk)
+                    for f in (cfg.bd_to_bench_vcf, cfg.bd_to_query_vcf):
+                        try:
+                            c.buildkey_to_vcf_src(f, rk, bk)
+                        except cfg.DesignError:
+                            pass
+
+                c_ = pickle.loads(pickle.dumps(c))
+
+                self.assertEqual(read_all(c_), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
+from __future__ import annotations
 import pandas as pd
-import json
 from pathlib import Path
 from typing import Any, assert_never, NamedTuple, Callable, TypeVar
 import common.config as cfg
@@ -452,16 +452,12 @@ def main(smk: Any) -> None:
                 ),
             )
 
-    def write_output(p: Path, ps: list[Path]) -> None:
-        with open(p, "w") as f:
-            json.dump([str(p) for p in ps], f)
-
     c, k, m, v = sconf.with_ref_data(rk, hap, dip1, dip2)
 
-    write_output(cds.output, c)
-    write_output(kir.io.output, k)
-    write_output(mhc.io.output, m)
-    write_output(vdj.io.output, v)
+    cfg.write_output_paths(cds.output, c)
+    cfg.write_output_paths(kir.io.output, k)
+    cfg.write_output_paths(mhc.io.output, m)
+    cfg.write_output_paths(vdj.io.output, v)
 
 
 main(snakemake)  # type: ignore
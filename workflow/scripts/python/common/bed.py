@@ -1,16 +1,22 @@
+from __future__ import annotations
 import gzip
 import threading
 import os
 import contextlib
-import pandas as pd
 import subprocess as sp
 from dataclasses import dataclass
-from typing import NewType, IO, Generator, NamedTuple
+from typing import NewType, IO, Generator, NamedTuple, TYPE_CHECKING
 from pathlib import Path
 from common.functional import not_none_unsafe, noop, DesignError
 from common.io import spawn_stream, bgzip_file
 import csv
 
+# NOTE pandas is slow to import and this module gets imported by the config
+# (and hence every snakemake process) regardless of whether any bed file will
+# actually be touched, so only import it where it is actually called
+if TYPE_CHECKING:
+    import pandas as pd
+
 # A complete chromosome name like "chr1" or "chr21_PATERNAL"
 ChrName = NewType("ChrName", str)
 
@@ -41,7 +47,7 @@ class IndexedBedLine(NamedTuple):
     end: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BedLine:
     """A struct-like representation of one line in a bed file.
 
@@ -68,9 +74,16 @@ def indexed_bedlines_to_df(
     xs: list[IndexedBedLine],
     to_map: FinalMapper,
 ) -> pd.DataFrame:
-    _xs = sorted(xs)
+    import pandas as pd
+
+    _xs = [x for x in sorted(xs) if x.chr in to_map]
+    # build this column-wise so pandas doesn't need to infer each row
     return pd.DataFrame(
-        [[to_map[x.chr], x.start, x.end] for x in _xs if x.chr in to_map]
+        {
+            0: [to_map[x.chr] for x in _xs],
+            1: [x.start for x in _xs],
+            2: [x.end for x in _xs],
+        }
     )
 
 
@@ -129,6 +142,8 @@ def read_bed_raw(
     more: list[int],
     comment: str | None,
 ) -> pd.DataFrame:
+    import pandas as pd
+
     bedcols = [*columns, *more]
     df = pd.read_table(
         h,
@@ -137,6 +152,9 @@ def read_bed_raw(
         sep=sep,
         skiprows=skip_lines,
         comment=comment,
+        # bed files shouldn't have missing values, and the coordinates must be
+        # ints anyways, so skip the (slow) NA detection on every field
+        na_filter=False,
         # satisfy type checker :/
         dtype={
             **{columns[0]: str, columns[1]: int, columns[2]: int},
@@ -295,12 +313,22 @@ def filter_sort_bed(
     Furthermore, 'to_map' should contain at least all corresponding entries
     from 'from_map', otherwise the final df will have NaNs.
     """
+    import numpy as np
+    import pandas as pd
+
     chr_col = df.columns.tolist()[0]
-    df[chr_col] = df[chr_col].map(from_map)
-    df = sort_bed_numerically(df.dropna(subset=[chr_col]), n)
+    # encode the chr names against the mapper in one vectorized pass (unmapped
+    # names get a code of -1) and then look up each code in an array of indices
+    # (there are at most 48, so a small int is enough and makes the sort cheap);
+    # the trailing -1 is what the unmapped code of -1 will pick out
+    codes = pd.Categorical(df[chr_col], categories=list(from_map)).codes
+    indices = np.array([*from_map.values(), -1], dtype=np.int8)
+    df[chr_col] = indices[codes]
+    # remove unmapped chrs and lines where the start and end are the same before
+    # sorting so we don't sort anything we throw away
+    df = sort_bed_numerically(df[(codes >= 0) & (df[1] != df[2])], n)
     df[chr_col] = df[chr_col].map(to_map)
-    # remove lines where the start and end are the same
-    return df[df[1] != df[2]].copy()
+    return df
 
 
 def split_bed(
@@ -99,16 +99,16 @@ Conventions:
 from __future__ import annotations
 import sys
 import json
-import pandas as pd
-import re
 from textwrap import fill
 from pathlib import Path
 from pydantic import BaseModel as BaseModel_
 from pydantic.generics import GenericModel as GenericModel_
 from pydantic.generics import GenericModelT
-from pydantic import validator, HttpUrl, FilePath, NonNegativeInt, Field
-from dataclasses import dataclass
-from enum import unique, Enum
+from pydantic import validator, HttpUrl, FilePath, NonNegativeInt, Field, PrivateAttr
+from pydantic import root_validator
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from enum import unique, Enum, IntEnum
 from typing import (
     IO,
     Union,
@@ -123,9 +123,13 @@ from typing import (
     Generic,
     TypeGuard,
     Protocol,
+    ClassVar,
+    Literal,
+    Iterator,
+    TYPE_CHECKING,
 )
 from typing_extensions import Self, assert_never
-from functools import reduce
+from functools import reduce, lru_cache, cached_property, partial, wraps
 from itertools import chain
 from more_itertools import duplicates_everseen, flatten
 from common.functional import (
@@ -146,6 +150,10 @@ from common.functional import (
 from common.io import is_gzip, is_bgzip, get_md5
 import common.bed as bed
 
+# see the NOTE in common.bed
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 ################################################################################
 # Type aliases
@@ -169,8 +177,9 @@ GCBound = tuple[Percent, bool]
 # a bare chromosome name (like "1" or "X")
 ShortChrName = NewType("ShortChrName", str)
 
-# the set chromosomes desired per build
-BuildChrs = NewType("BuildChrs", "set[ChrIndex]")
+# the set chromosomes desired per build (frozen so that it is hashable and
+# can be safely shared by all the chromosome conversions for the build)
+BuildChrs = NewType("BuildChrs", "frozenset[ChrIndex]")
 
 # the set of chromosomes specific to a haplotype
 HapChrs = NewType("HapChrs", "set[ChrIndex]")
@@ -215,13 +224,20 @@ def flip_hap(h: Haplotype) -> Haplotype:
     return h.choose(Haplotype.MAT, Haplotype.PAT)
 
 
+# NOTE there are only a handful of distinct refkeys in any config, and these
+# are parsed over and over again when building the DAG, so cache them (which
+# is safe since the result is immutable)
+@lru_cache(maxsize=None)
 def parse_full_refkey_class(s: RefKeyFullS) -> RefKeyFull:
-    m = re.match("(.+)\\.([mp]at)", s)
-    # ASSUME this will never fail due to the pat/mat permitted match pattern
-    rk, hap = (s, None) if m is None else (m[1], Haplotype.from_name(m[2]))
-    return RefKeyFull(RefKey(rk), hap)
+    # a plain suffix test is much cheaper than a regex here
+    if len(s) > 4 and s.endswith((".pat", ".mat")):
+        return RefKeyFull(RefKey(sys.intern(s[:-4])), Haplotype.from_name(s[-3:]))
+    return RefKeyFull(RefKey(s), None)
 
 
+# NOTE this is called on nearly every dispatch with a full refkey, so cache the
+# tuple too rather than rebuilding it from the cached class each time
+@lru_cache(maxsize=None)
 def parse_full_refkey(s: RefKeyFullS) -> tuple[RefKey, Haplotype | None]:
     return parse_full_refkey_class(s).as_tuple
 
@@ -231,7 +247,7 @@ def strip_full_refkey(s: RefKeyFullS) -> RefKey:
 
 
 def flip_full_refkey_class(r: RefKeyFull) -> RefKeyFull:
-    return RefKeyFull(r.key, fmap_maybe(flip_hap, r.hap))
+    return RefKeyFull(r.key, None if r.hap is None else flip_hap(r.hap))
 
 
 def flip_full_refkey(s: RefKeyFullS) -> RefKeyFullS:
@@ -248,40 +264,34 @@ def choose_xy_unsafe(c: ChrIndex, x_res: X, y_res: X) -> X:
 
 
 def sort_chr_indices(cs: HapChrs) -> OrderedHapChrs:
-    return OrderedHapChrs(
-        [x for x, _ in sorted([(c, c.value) for c in cs], key=lambda x: x[1])]
-    )
+    # there are only 24 indices in a fixed order, so just walk them rather
+    # than sorting
+    return OrderedHapChrs([c for c in SORTED_CHR_INDICES if c in cs])
 
 
-def refkey_config_to_prefix(split: bool, nohap: bool) -> str:
-    sp = "split" if split else "nosplit"
-    hp = "nohap" if nohap else "withhap"
-    return f"{sp}_{hp}"
+# there are only four combinations of split/nohap, so just tabulate them
+REFKEY_CONFIG_PREFIXES: dict[tuple[bool, bool], str] = {
+    (True, True): "split_nohap",
+    (True, False): "split_withhap",
+    (False, True): "nosplit_nohap",
+    (False, False): "nosplit_withhap",
+}
 
+PREFIX_REFKEY_CONFIGS: dict[str, tuple[bool, bool]] = {
+    v: k for k, v in REFKEY_CONFIG_PREFIXES.items()
+}
 
-def prefix_to_refkey_config(s: str) -> tuple[bool, bool]:
-    m = re.match("^([^_]+)_([^_]+)", s)
 
-    if m is None:
-        raise DesignError(f"could not parse refkeys config: {s}")
-
-    match m[1]:
-        case "split":
-            split = True
-        case "nosplit":
-            split = False
-        case _ as e:
-            raise DesignError(f"unknown split {e}")
+def refkey_config_to_prefix(split: bool, nohap: bool) -> str:
+    return REFKEY_CONFIG_PREFIXES[(split, nohap)]
 
-    match m[2]:
-        case "withhap":
-            nohap = False
-        case "nohap":
-            nohap = True
-        case _ as e:
-            raise DesignError(f"unknown split {e}")
 
-    return split, nohap
+def prefix_to_refkey_config(s: str) -> tuple[bool, bool]:
+    # the prefix is the first two '_'-delimited fields
+    try:
+        return PREFIX_REFKEY_CONFIGS["_".join(s.split("_", 2)[:2])]
+    except KeyError:
+        raise DesignError(f"could not parse refkeys config: {s}")
 
 
 def make_double(f: Callable[[Haplotype], X]) -> Double[X]:
@@ -301,6 +311,17 @@ def to_str_refkeys(x: SingleOrDouble[X], rk: RefKey) -> RefKeyFullS1or2:
     return to_refkeys(x, rk).map(lambda k: k.name)
 
 
+def iter_str_refkeys(x: SingleOrDouble[X], rk: RefKey) -> Iterator[RefKeyFullS]:
+    """Like 'to_str_refkeys' but for callers that only need to iterate."""
+    if isinstance(x, Single):
+        yield RefKeyFull(rk, None).name
+    elif isinstance(x, Double):
+        for h in Haplotype:
+            yield RefKeyFull(rk, h).name
+    else:
+        assert_never(x)
+
+
 def match1_unsafe(xs: list[X], f: Callable[[X], Y], msg: None | str = None) -> Y:
     """Call function with the one value from a singleton list.
 
@@ -360,7 +381,7 @@ def is_dip1_bed(
     x: BedFile[Dip1Src[S] | Dip2Src[S]] | DipBedCoords,
 ) -> TypeGuard[BedFile[Dip1Src[S]] | Dip1BedCoords]:
     return isinstance(x, Dip1BedCoords) or (
-        isinstance(x, BedFile) and isinstance(x.bed, Dip1Src)
+        isinstance(x, BedFile) and x.bed.ploidy == 1
     )
 
 
@@ -368,7 +389,7 @@ def is_dip2_bed(
     x: BedFile[Dip1Src[S] | Dip2Src[S]] | DipBedCoords,
 ) -> TypeGuard[BedFile[Dip2Src[S]] | Dip2BedCoords]:
     return isinstance(x, Dip2BedCoords) or (
-        isinstance(x, BedFile) and isinstance(x.bed, Dip2Src)
+        isinstance(x, BedFile) and x.bed.ploidy == 2
     )
 
 
@@ -431,11 +452,11 @@ def with_ref_data(
     dip1_f: Callable[[Dip1RefData], X],
     dip2_f: Callable[[Dip2RefData], X],
 ) -> X:
-    if isinstance(rd.ref, HapSrc):
+    if rd.ref.ploidy == 0:
         return hap_f(rd)
-    elif isinstance(rd.ref, Dip1Src):
+    elif rd.ref.ploidy == 1:
         return dip1_f(rd)
-    elif isinstance(rd.ref, Dip2Src):
+    elif rd.ref.ploidy == 2:
         return dip2_f(rd)
     else:
         assert_never(rd)
@@ -447,11 +468,11 @@ def with_build_data(
     dip1_f: Callable[[Dip1BuildData], X],
     dip2_f: Callable[[Dip2BuildData], X],
 ) -> X:
-    if isinstance(bd.refdata.ref, HapSrc):
+    if bd.refdata.ref.ploidy == 0:
         return hap_f(bd)
-    elif isinstance(bd.refdata.ref, Dip1Src):
+    elif bd.refdata.ref.ploidy == 1:
         return dip1_f(bd)
-    elif isinstance(bd.refdata.ref, Dip2Src):
+    elif bd.refdata.ref.ploidy == 2:
         return dip2_f(bd)
     else:
         assert_never(bd)
@@ -565,27 +586,13 @@ def dip2_noop_conversion(h: Haplotype, bd: Dip2BuildData) -> HapToHapChrConversi
 # functions for dealing with 'dict[RefKey, X]' type things
 
 
-def to_ref_data_unsafe(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
-    rk: RefKey,
-) -> RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]:
-    try:
-        s = xs[rk]
-        return RefData_(rk, s.ref, s.strat_inputs, s.builds)
-    except KeyError:
-        raise DesignError(f"Could not get ref data for key '{rk}'")
-
-
 def all_ref_data(
     xs: dict[
         RefKey,
         Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
     ],
 ) -> list[RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]]:
-    return [to_ref_data_unsafe(xs, rk) for rk in xs]
+    return [RefData_(rk, s.ref, s.strat_inputs, s.builds) for rk, s in xs.items()]
 
 
 def all_ref_refsrckeys(
@@ -594,62 +601,49 @@ def all_ref_refsrckeys(
         Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
     ],
 ) -> list[RefKeyFullS]:
-    return [s for k, v in xs.items() for s in to_str_refkeys(v.ref.src, k).as_list]
+    return [s for k, v in xs.items() for s in iter_str_refkeys(v.ref.src, k)]
 
 
 def all_build_data(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
+    rds: list[RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]],
 ) -> list[BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]]:
-    return [r.to_build_data_unsafe(b) for r in all_ref_data(xs) for b in r.builds]
+    # NOTE go through each ref data's memo so that the build data here are the
+    # same objects returned by lookups elsewhere (and thus their cached
+    # properties are shared)
+    return [r.to_build_data_unsafe(bk) for r in rds for bk in r.builds]
 
 
-def all_bed_build_and_refsrckeys(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
-    f: BuildDataToSrc,
-) -> list[tuple[RefKeyFullS, BuildKey]]:
-    return [
-        (rk, b.buildkey)
-        for b in all_build_data(xs)
-        if (src := f(b)) is not None
-        for rk in to_str_refkeys(src, b.refdata.refkey).as_list
-    ]
+# NOTE the following take build data computed by 'all_build_data' (rather
+# than the stratifications themselves) so that it only needs to be made once
 
 
-def all_bed_refsrckeys(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
+def all_bed_build_and_refsrckeys(
+    bds: list[BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]],
     f: BuildDataToSrc,
-) -> list[RefKeyFullS]:
-    return [rk for rk, _ in all_bed_build_and_refsrckeys(xs, f)]
-
-
-def all_build_keys(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
-) -> list[tuple[RefKey, BuildKey]]:
-    return [(r.refdata.refkey, r.buildkey) for r in all_build_data(xs)]
+) -> list[tuple[RefKeyFullS, BuildKey]]:
+    # the refkeys only depend on the refkey itself and whether the source is
+    # single or double, so only make them once per combination rather than
+    # once per build
+    memo: dict[tuple[RefKey, bool], list[RefKeyFullS]] = {}
+    out: list[tuple[RefKeyFullS, BuildKey]] = []
+    for b in bds:
+        if (src := f(b)) is None:
+            continue
+        rk = b.refdata.refkey
+        k = (rk, isinstance(src, Double))
+        if (rks := memo.get(k)) is None:
+            rks = memo[k] = to_str_refkeys(src, rk).as_list
+        out += [(r, b.buildkey) for r in rks]
+    return out
 
 
 def all_ref_build_keys(
-    xs: dict[
-        RefKey,
-        Stratification[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
-    ],
+    bds: list[BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]],
 ) -> list[tuple[RefKeyFullS, BuildKey]]:
     return [
         (rk, r.buildkey)
-        for r in all_build_data(xs)
-        for rk in to_str_refkeys(r.refdata.ref.src, r.refdata.refkey).as_list
+        for r in bds
+        for rk in iter_str_refkeys(r.refdata.ref.src, r.refdata.refkey)
     ]
 
 
@@ -666,6 +660,14 @@ def prepare_output_path(path: Path) -> Path:
     return Path(str(path).replace("{ref_key}", "%s"))
 
 
+def write_output_paths(output: Path, ps: list[Path]) -> None:
+    """Write a list of paths as a json array (for normalization checkpoints)."""
+    # NOTE json.dump streams through the pure-python encoder whereas json.dumps
+    # uses the C encoder in one shot
+    with open(output, "w") as f:
+        f.write(json.dumps([str(p) for p in ps]))
+
+
 # itty bitty accessor functions
 
 
@@ -802,24 +804,66 @@ def bd_to_other_bed(
 def bd_to_bench_bed(
     x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
 ) -> BedFile[BedSrcT] | None:
-    return fmap_maybe(lambda y: y.bench_bed, x.build.bench)
+    b = x.build.bench
+    return None if b is None else b.bench_bed
+
+
+# NOTE this is a named module-level function (rather than a lambda at the call
+# site) so that it can be used as a memo key (and pickled along with the memo).
+# The return type is Any since a def (unlike a lambda) can't satisfy the
+# constrained TypeVar in 'BuildDataToSrc'; the source is really a Single or
+# Double depending on the ploidy of the reference.
+def bd_to_bench_bed_src(
+    x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
+) -> Any:
+    b = bd_to_bench_bed(x)
+    return None if b is None else b.bed.src
+
+
+def si_to_bed_src_getter(f: StratInputToBed) -> RefDataToSrc:
+    """Lift a strat input bed getter to one returning the bed's source(s).
+
+    Returns None if 'f' gives nothing or gives coordinates (not a bed file).
+    """
+    return lambda rd: (
+        b.bed.src if isinstance(b := f(rd.strat_inputs), BedFile) else None
+    )
+
+
+def bd_to_bed_src_getter(f: BuildDataToBed, bk: BuildKey) -> RefDataToSrc:
+    """Like 'si_to_bed_src_getter' but for build-specific bed getters."""
+    return lambda rd: (
+        b.bed.src if isinstance(b := f(rd.to_build_data(bk)), BedFile) else None
+    )
 
 
 def bd_to_bench_vcf(
     x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
 ) -> VCFFile[VcfSrcT] | None:
-    return fmap_maybe(lambda y: y.bench_vcf, x.build.bench)
+    b = x.build.bench
+    return None if b is None else b.bench_vcf
 
 
 def bd_to_query_vcf(
     x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT],
 ) -> VCFFile[VcfSrcT] | None:
-    return fmap_maybe(lambda y: y.query_vcf, x.build.bench)
+    b = x.build.bench
+    return None if b is None else b.query_vcf
 
 
 # snakemake helpers
 
 
+# NOTE ref/build (and other level/strat) keys are compared and hashed
+# constantly when building the DAG, so intern them wherever they enter (yaml or
+# wildcards) so that lookups can short circuit on identity
+def intern_keys(v: Any) -> Any:
+    "Intern the keys of a raw (unvalidated) dict; pass anything else through."
+    if isinstance(v, dict):
+        return {(sys.intern(k) if isinstance(k, str) else k): x for k, x in v.items()}
+    return v
+
+
 def wc_lookup(ws: SmkWildcards, k: str) -> Any:
     try:
         return ws[k]
@@ -828,15 +872,15 @@ def wc_lookup(ws: SmkWildcards, k: str) -> Any:
 
 
 def wc_to_refkey(ws: SmkWildcards) -> RefKey:
-    return RefKey(wc_lookup(ws, "ref_key"))
+    return RefKey(sys.intern(wc_lookup(ws, "ref_key")))
 
 
 def wc_to_buildkey(ws: SmkWildcards) -> BuildKey:
-    return BuildKey(wc_lookup(ws, "build_key"))
+    return BuildKey(sys.intern(wc_lookup(ws, "build_key")))
 
 
 def wc_to_reffinalkey(ws: SmkWildcards) -> RefKeyFullS:
-    return RefKeyFullS(wc_lookup(ws, "ref_final_key"))
+    return RefKeyFullS(sys.intern(wc_lookup(ws, "ref_final_key")))
 
 
 def smk_to_param_str(smk: Any, name: str) -> str:
@@ -868,7 +912,7 @@ def smk_to_param_path(smk: Any, name: str) -> Path:
 
 
 def smk_to_param_paths(smk: Any, name: str) -> list[Path]:
-    return [Path(p) for p in smk_to_param_strs(smk, name)]
+    return list(map(Path, smk_to_param_strs(smk, name)))
 
 
 def smk_to_output(smk: Any, n: int = 0) -> Path:
@@ -923,10 +967,9 @@ def smk_to_inputs(smk: Any, n: int = 0, allow_empty: bool = False) -> list[Path]
     if isinstance(i, str):
         raise DesignError(f"Input files for {i} are not a list")
     else:
-        ps = [Path(p) for p in i]
         if len(i) == 0 and not allow_empty:
             raise DesignError(f"Input files for {i} is an empty list")
-        return ps
+        return list(map(Path, i))
 
 
 def smk_to_inputs_all(smk: Any, allow_empty: bool = False) -> list[Path]:
@@ -934,10 +977,9 @@ def smk_to_inputs_all(smk: Any, allow_empty: bool = False) -> list[Path]:
     if isinstance(i, str):
         raise DesignError(f"Input files for {i} are not a list")
     else:
-        ps = [Path(p) for p in i]
         if len(i) == 0 and not allow_empty:
             raise DesignError(f"Input files for {i} is an empty list")
-        return ps
+        return list(map(Path, i))
 
 
 def smk_to_input_name(smk: Any, name: str) -> Path:
@@ -959,18 +1001,48 @@ def smk_to_inputs_name(smk: Any, name: str, allow_empty: bool = False) -> list[P
         if isinstance(x, str):
             raise DesignError(f"Input files for {name} are not a list")
         else:
-            ps = [Path(p) for p in x]
-            if len(ps) == 0 and not allow_empty:
+            if len(x) == 0 and not allow_empty:
                 raise DesignError(f"Input files for {name} is an empty list")
-            return ps
+            return list(map(Path, x))
 
     else:
         raise DesignError(f"Input files do not have name {name}")
 
 
+def smk_view(smk: Any) -> SmkView:
+    """Parse a snakemake object with ref_key and build_key wildcards."""
+    ws: SmkWildcards = smk.wildcards
+
+    if not isinstance((ins := smk.input), list) or not all(
+        isinstance(x, str) for x in ins
+    ):
+        raise DesignError(f"Inputs must be a list of strings, got {ins}")
+
+    return SmkView(
+        config=smk.config,
+        refkey=wc_to_refkey(ws),
+        buildkey=wc_to_buildkey(ws),
+        inputs=list(map(Path, ins)),
+        outputs=list(map(Path, smk.output)),
+        params=smk.params,
+    )
+
+
 # IO functions for processing bed files of various flavors
 
 
+def both_threaded(x: Double[X], f: Callable[[X, Haplotype], Y]) -> Double[Y]:
+    """Like 'Double.both' but run each haplotype in its own thread.
+
+    This is meant for reading/writing bed files, where most of the time is
+    spent in (de)compression which either happens in a subprocess or releases
+    the GIL. Any exception will be re-raised in the calling thread.
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fs = x.both(lambda y, hap: ex.submit(f, y, hap))
+    return fs.map(lambda fut: fut.result())
+
+
 def read_filter_sort_hap_bed(
     bd: HapBuildData, bf: HapBedFile, ipath: Path
 ) -> pd.DataFrame:
@@ -1028,10 +1100,18 @@ def read_filter_sort_dip2to1_bed(
     imap = conv.init_mapper
     fmap = conv.final_mapper
 
+    import pandas as pd
+
+    dfs = both_threaded(ipath, lambda i, _: bf.read(i))
+
+    # NOTE the paternal indices are all less than the maternal indices, so
+    # concatenating two sorted beds in this order gives a sorted bed; also
+    # each half already has its own fresh index, so don't bother making a
+    # third (duplicated) one out of the two
     return pd.concat(
-        imap.both(
-            lambda i, hap: bed.filter_sort_bed(i, fmap, bf.read(ipath.choose(hap)))
-        ).as_list
+        imap.both(lambda i, hap: bed.filter_sort_bed(i, fmap, dfs.choose(hap))).as_list,
+        ignore_index=True,
+        copy=False,
     )
 
 
@@ -1077,7 +1157,7 @@ def read_write_filter_sort_dip1to2_bed(
 ) -> None:
     """Read a haploid bed file, sort it, and write it in bgzip format."""
     res = read_filter_sort_dip1to2_bed(bd, bf, ipath).sum(opath)
-    res.both(lambda r, hap: bed.write_bed(r[1], hap.choose(g0, g1)(r[0])))
+    both_threaded(res, lambda r, hap: bed.write_bed(r[1], hap.choose(g0, g1)(r[0])))
 
 
 def read_filter_sort_dip2to2_bed(
@@ -1104,6 +1184,27 @@ def read_write_filter_sort_dip2to2_bed(
     bed.write_bed(opath, g(df))
 
 
+def read_write_filter_sort_dip2to2_beds(
+    ipath: Double[Path],
+    opath: Double[Path],
+    bd: Dip2BuildData,
+    bf: Dip2BedFile,
+    g: Callable[[pd.DataFrame], pd.DataFrame] = lambda x: x,
+) -> None:
+    """Like 'read_write_filter_sort_dip2to2_bed' but for both haplotypes.
+
+    The chromosome conversion is only built once and shared between the two
+    haplotypes, which are then processed in parallel.
+    """
+    conv = bd.refdata.ref.hap_chr_conversion(bf.bed.chr_pattern, bd.build_chrs)
+
+    def go(i: Path, o: Path, c: HapToHapChrConversion) -> None:
+        df = bed.filter_sort_bed(c.init_mapper, c.final_mapper, bf.read(i))
+        bed.write_bed(o, g(df))
+
+    both_threaded(ipath.sum(opath), lambda io, h: go(*io, conv.choose(h)))
+
+
 def build_hap_coords_df(bd: HapBuildData, bf: HapBedCoords) -> pd.DataFrame:
     to_map = bd.refdata.ref.chr_pattern.final_mapper(bd.build_chrs, Haplotype.PAT)
     return bed.indexed_bedlines_to_df(bf.lines(Haplotype.PAT).elem, to_map)
@@ -1219,10 +1320,10 @@ def filter_sort_bed_main_inner(
             return [o]
 
         def _dip2to2(
-            i: Path, o: Path, hap: Haplotype, bd: Dip2BuildData, bf: Dip2BedFile
+            i: Double[Path], o: Double[Path], bd: Dip2BuildData, bf: Dip2BedFile
         ) -> list[Path]:
-            read_write_filter_sort_dip2to2_bed(i, o, hap, bd, bf, g)
-            return [o]
+            read_write_filter_sort_dip2to2_beds(i, o, bd, bf, g)
+            return o.as_list
 
         return sconf.with_build_data_and_bed_io(
             rk,
@@ -1231,11 +1332,7 @@ def filter_sort_bed_main_inner(
             output,
             output_pattern,
             f,
-            _hap,
-            _dip1to1,
-            _dip1to2,
-            _dip2to1,
-            _dip2to2,
+            BedIOFunctions(_hap, _dip1to1, _dip1to2, _dip2to1, _dip2to2),
         )
 
 
@@ -1251,23 +1348,20 @@ def filter_sort_bed_main(
     retrieve the bed configuration from the config instance (which will be
     obtained from the snakemake object).
     """
-    sconf: GiabStrats = smk.config
-    ws: SmkWildcards = smk.wildcards
-
-    if not isinstance((ins := smk.input), list) and not all(
-        isinstance(x, str) for x in ins
-    ):
-        raise DesignError(f"Inputs must be a list of strings, got {ins}")
+    v = smk_view(smk)
 
-    if not isinstance(output_pattern := smk.params["output_pattern"], str):
+    if not isinstance(output_pattern := v.params["output_pattern"], str):
         raise DesignError(f"Output pattern must be a string, got {output_pattern}")
 
+    if len(v.outputs) == 0:
+        raise DesignError("No output file for index 0")
+
     filter_sort_bed_main_inner(
-        sconf,
-        wc_to_refkey(ws),
-        wc_to_buildkey(ws),
-        [Path(i) for i in ins],
-        smk.output[0],
+        v.config,
+        v.refkey,
+        v.buildkey,
+        v.inputs,
+        v.outputs[0],
         output_pattern,
         f,
         g,
@@ -1413,7 +1507,8 @@ class Double(Generic[X]):
         return Double((self.pat, y.pat, z.pat), (self.mat, y.mat, z.mat))
 
     def choose(self, hap: Haplotype) -> X:
-        return hap.choose(self.pat, self.mat)
+        # NOTE pat = 0 and mat = 1
+        return (self.pat, self.mat)[hap.value]
 
     def both(self, f: Callable[[X, Haplotype], Y]) -> Double[Y]:
         return Double(f(self.pat, Haplotype.PAT), f(self.mat, Haplotype.MAT))
@@ -1426,7 +1521,7 @@ SingleOrDouble = Single[X] | Double[X]
 NullOrSingleOrDouble = Null[X] | SingleOrDouble[X]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RefKeyFull:
     """Ref key which may or may not have a haplotype appended to it."""
 
@@ -1451,6 +1546,22 @@ class RefKeyFull:
         return RefKeyFullS(f"{k}.{h.name}" if h is not None else k)
 
 
+@dataclass(frozen=True, slots=True)
+class SmkView:
+    """The parts of the snakemake object needed by a build-level script.
+
+    Everything is pulled out of the snakemake object once up front, since
+    each access to its named lists goes through several layers of lookup.
+    """
+
+    config: GiabStrats
+    refkey: RefKey
+    buildkey: BuildKey
+    inputs: list[Path]
+    outputs: list[Path]
+    params: Any
+
+
 class Haplotype(Enum):
     "One of the human diploid haplotypes. 0 = Paternal, 1 = Maternal"
     PAT: int = 0
@@ -1460,8 +1571,8 @@ class Haplotype(Enum):
     def from_name(cls, n: str) -> Self:
         "Build haplotype from a string. Must be exactly 'pat' or 'mat'."
         try:
-            return next(i for i in cls if i.name == n)
-        except StopIteration:
+            return cls(_HAPLOTYPE_NAMES[n])
+        except KeyError:
             raise ValueError(f"could not make haplotype from name '{n}'")
 
     @property
@@ -1470,20 +1581,21 @@ class Haplotype(Enum):
 
     def choose(self, left: X, right: X) -> X:
         "Do either left (pat) or right (mat) depending on the haplotype."
-        if self is Haplotype.PAT:
-            return left
-        elif self is Haplotype.MAT:
-            return right
-        else:
-            assert_never(self)
+        return (left, right)[self.value]
+
+
+# NOTE 'name' is overridden above, so Haplotype[n] won't work for lookups
+_HAPLOTYPE_NAMES: dict[str, int] = {h.name: h.value for h in Haplotype}
 
 
 @unique
-class ChrIndex(Enum):
+class ChrIndex(IntEnum):
     """Represents a valid chromosome index.
 
     Chromosomes are numbered by integers 1-24 (23 and 24 being X and Y
-    respectively). These integers reflect the sort order in output bed files.
+    respectively). These integers reflect the sort order in output bed files,
+    and since this is an IntEnum, indices can be compared, sorted, and hashed
+    directly as ints.
     """
 
     # NOTE: these start at 1 not 0 to conincide with the names of (most)
@@ -1517,8 +1629,8 @@ class ChrIndex(Enum):
     def from_name(cls, n: str) -> Self:
         "Build chr index from a string. Must be a valid digit or 'X' or 'Y'"
         try:
-            return next(i for i in cls if i.chr_name == n)
-        except StopIteration:
+            return cls(_CHR_INDEX_NAMES[n])
+        except KeyError:
             raise ValueError(f"could make chr index from name '{n}'")
 
     @classmethod
@@ -1529,13 +1641,31 @@ class ChrIndex(Enum):
         except ValueError as e:
             raise DesignError(e)
 
+    # NOTE keep the plain Enum behavior for strings (ie "ChrIndex.CHR1" rather
+    # than "1") so error messages and the like don't change with the int base
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[[Any], Self]]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v: Any) -> Self:
+        """Validate a chr index for pydantic.
+
+        Without this, pydantic treats IntEnums as ints first and would coerce
+        strings like "1"; only accept what a plain Enum would (ie the value).
+        """
+        return cls(v)
+
     def __init__(self, i: int) -> None:
         "Build chr index from an integer (which must be in [1,24])"
         self.chr_name = ShortChrName("X" if i == 23 else ("Y" if i == 24 else str(i)))
 
     def to_internal_index(self, hap: Haplotype) -> bed.InternalChrIndex:
         "Convert this index into an integer corresponding to sort order"
-        return bed.InternalChrIndex(hap.value * 24 + self.value - 1)
+        return bed.InternalChrIndex(hap.value * 24 + self - 1)
 
     # TODO this obviously only makes sense for males
     @property
@@ -1545,7 +1675,25 @@ class ChrIndex(Enum):
 
         Throw DesignError if not X or Y.
         """
-        return choose_xy_unsafe(self, Haplotype.MAT, Haplotype.PAT)
+        try:
+            return _XY_HAPLOTYPES[self]
+        except KeyError:
+            raise DesignError(f"I am not an X or Y, I am a {self}")
+
+
+_CHR_INDEX_NAMES: dict[str, int] = {c.chr_name: c.value for c in ChrIndex}
+
+# NOTE members iterate in definition order, which is also their sort order
+SORTED_CHR_INDICES: tuple[ChrIndex, ...] = tuple(ChrIndex)
+
+ALL_CHR_INDICES: frozenset[ChrIndex] = frozenset(ChrIndex)
+
+_XY_HAPLOTYPES: dict[ChrIndex, Haplotype] = {
+    ChrIndex.CHRX: Haplotype.MAT,
+    ChrIndex.CHRY: Haplotype.PAT,
+}
+
+XY_CHR_INDICES: frozenset[ChrIndex] = frozenset(_XY_HAPLOTYPES)
 
 
 @unique
@@ -1658,58 +1806,67 @@ class DipToHapChrConversion:
         return self.toPattern.both(lambda p, h: p.final_mapper(self.indices, h))
 
 
-class ChrData(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class ChrData:
     idx: bed.InternalChrIndex
     name: bed.ChrName
     shortname: ShortChrName
     haplotype: Haplotype
 
 
-# tuples representing file paths for the pipeline
+# structs representing file paths for the pipeline
 
 
-class DataLogDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class DataLogDirs:
     data: Path
     log: Path
 
 
-class DataLogBenchDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class DataLogBenchDirs:
     data: Path
     log: Path
     bench: Path
 
 
-class FilterSortDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class FilterSortDirs:
     data: Path
     bench: Path
     log: Path
     subbed: Path
 
 
-class BedInterDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class BedInterDirs:
     filtersort: FilterSortDirs
     postsort: DataLogBenchDirs
 
 
-class BedDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class BedDirs:
     src: DataLogDirs
     inter: BedInterDirs
     final: Callable[[str], Path]
     readme: Path
 
 
-class RefInterDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class RefInterDirs:
     prebuild: DataLogBenchDirs
     filtersort: FilterSortDirs
     build: DataLogBenchDirs
 
 
-class RefSrcDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class RefSrcDirs:
     benchmark: DataLogDirs
     reference: DataLogDirs
 
 
-class RefDirs(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class RefDirs:
     src: RefSrcDirs
     inter: RefInterDirs
 
@@ -1946,11 +2103,6 @@ class MaleHapSexPaths(_SexPaths):
         return [x for x in [self.x, self.y] if x is not None]
 
 
-# TODO when we need it...
-# class FemaleHapSexPaths(NamedTuple):
-#     x: SubSexPaths
-
-
 @dataclass(frozen=True)
 class Dip1SexPaths(_SexPaths):
     sex1: SubSexPaths | None  # X
@@ -2304,7 +2456,7 @@ CHR_HAP_PLACEHOLDER = "%h"
 MHC_CHR = ChrIndex(6)
 KIR_CHR = ChrIndex(19)
 
-VDJ_CHRS = {ChrIndex(i) for i in [2, 7, 14, 22]}
+VDJ_CHRS = frozenset(ChrIndex(i) for i in [2, 7, 14, 22])
 
 # strats in "OtherDifficult" that are built-in and should not be included
 # manually using the "other_strats" directive in "build"
@@ -2317,16 +2469,21 @@ OTHERDIFF_KEY = OtherLevelKey("OtherDifficult")
 # Snakemake configuration model
 
 
+# NOTE everything is frozen, so there is no reason for pydantic to copy a model
+# instance when it is used as a field in another model (which would also throw
+# away anything memoized in its private attributes)
 class BaseModel(BaseModel_):
     class Config:
         frozen = True
         extra = "forbid"
+        copy_on_model_validation = "none"
 
 
 class GenericModel(GenericModel_):
     class Config:
         frozen = True
         extra = "forbid"
+        copy_on_model_validation = "none"
 
     # dirty hack to get pickling to work for generic model types; see
     # https://github.com/pydantic/pydantic/issues/1667
@@ -2399,9 +2556,36 @@ class Diploid(GenericModel, Generic[X]):
     pat: X
     mat: X
 
+    # plain dataclass mirror of this model (see below)
+    _double: Double[X] | None = PrivateAttr(None)
+
     @property
     def double(self) -> Double[X]:
-        return Double(pat=self.pat, mat=self.mat)
+        # this is used in lots of tight loops (chr name/exclusion lookups), so
+        # only make it once; the model is frozen so this will never go stale
+        if (d := self._double) is None:
+            d = self._double = Double(pat=self.pat, mat=self.mat)
+        return d
+
+
+def chr_indices_to_mask(cs: set[ChrIndex]) -> int:
+    """Pack a set of chr indices into an int with one bit per index."""
+    return sum(1 << c for c in cs)
+
+
+# NOTE the mappers are shared between callers via the caches in each pattern, so
+# they must never be mutated
+Mappers = tuple[bed.InitMapper, bed.FinalMapper]
+
+
+def chr_data_to_mappers(ds: list[ChrData]) -> Mappers:
+    """Make the init and final mappers in one pass through the chr data."""
+    init: bed.InitMapper = {}
+    final: bed.FinalMapper = {}
+    for d in ds:
+        init[d.name] = d.idx
+        final[d.idx] = d.name
+    return (init, final)
 
 
 class ChrPattern:
@@ -2422,49 +2606,98 @@ class HapChrPattern(BaseModel, ChrPattern):
     special: dict[ChrIndex, bed.ChrName] = {}
     exclusions: set[ChrIndex] = set()
 
+    # memo for 'to_chr_data'; the pattern is frozen, and the same set of build
+    # chromosomes gets converted over and over again (once per mapper)
+    _chr_data_cache: dict[tuple[BuildChrs, Haplotype], list[ChrData]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    # memo for '_mappers' (same deal as above)
+    _mapper_cache: dict[tuple[BuildChrs, Haplotype], Mappers] = PrivateAttr(
+        default_factory=dict
+    )
+
+    # the template split around the chr index placeholder (computed lazily since
+    # 'construct' will bypass any validators)
+    _template_parts: tuple[str, str] | None = PrivateAttr(None)
+
+    # 'exclusions' as a bitmask (also lazy for the same reason as above)
+    _exclusion_mask: int | None = PrivateAttr(None)
+
+    # memo for 'to_chr_name'
+    _chr_names: dict[ChrIndex, bed.ChrName | None] = PrivateAttr(default_factory=dict)
+
+    # NOTE raise rather than assert in the pattern validators since these
+    # guarantee that '_template_parts' can unpack the split template, and
+    # asserts disappear under 'python -O'
     @validator("template")
     def is_valid_template(cls, v: str) -> str:
-        assert v.count(CHR_INDEX_PLACEHOLDER) == 1, "chr template must have '%i' in it"
+        if v.count(CHR_INDEX_PLACEHOLDER) != 1:
+            raise ValueError("chr template must have '%i' in it")
         return v
 
     def _is_excluded(self, i: ChrIndex) -> bool:
-        return i in self.exclusions
+        if (m := self._exclusion_mask) is None:
+            m = self._exclusion_mask = chr_indices_to_mask(self.exclusions)
+        return bool(m >> i & 1)
 
     def filter_indices(self, cs: BuildChrs) -> HapChrs:
         return HapChrs({i for i in cs if not self._is_excluded(i)})
 
     def to_chr_name(self, i: ChrIndex) -> bed.ChrName | None:
+        try:
+            return self._chr_names[i]
+        except KeyError:
+            n = self._chr_names[i] = self._to_chr_name(i)
+            return n
+
+    def _to_chr_name(self, i: ChrIndex) -> bed.ChrName | None:
         if self._is_excluded(i):
             return None
         elif i in self.special:
             return self.special[i]
         else:
-            return bed.ChrName(
-                self.template.replace(
-                    CHR_INDEX_PLACEHOLDER,
-                    str(i.chr_name),
-                )
-            )
+            if (ps := self._template_parts) is None:
+                # ASSUME the validator ensures there is exactly one placeholder
+                pre, post = self.template.split(CHR_INDEX_PLACEHOLDER)
+                ps = self._template_parts = (pre, post)
+            # NOTE these names end up as mapper keys which are matched against
+            # every row of a bed file, so intern them
+            return bed.ChrName(sys.intern(f"{ps[0]}{i.chr_name}{ps[1]}"))
 
     def to_chr_data(self, cs: BuildChrs, h: Haplotype) -> list[ChrData]:
-        return [
-            ChrData(c.to_internal_index(h), n, c.chr_name, h)
-            for c in sort_chr_indices(self.filter_indices(cs))
-            if (n := self.to_chr_name(c)) is not None
-        ]
+        # NOTE this is a noop if 'cs' is already frozen
+        k = (BuildChrs(frozenset(cs)), h)
+        try:
+            return self._chr_data_cache[k]
+        except KeyError:
+            ds = [
+                ChrData(c.to_internal_index(h), n, c.chr_name, h)
+                for c in sort_chr_indices(self.filter_indices(cs))
+                if (n := self.to_chr_name(c)) is not None
+            ]
+            self._chr_data_cache[k] = ds
+            return ds
 
     def to_names(self, cs: BuildChrs) -> OrderedHapChrNames:
         # NOTE: the haplotype argument is doing nothing since it is only
         # used to make the index which I remove before returning here
-        return OrderedHapChrNames(
-            [bed.ChrName(x[1]) for x in self.to_chr_data(cs, Haplotype.PAT)]
-        )
+        return OrderedHapChrNames([x.name for x in self.to_chr_data(cs, Haplotype.PAT)])
+
+    def _mappers(self, cs: BuildChrs, hap: Haplotype) -> Mappers:
+        k = (BuildChrs(frozenset(cs)), hap)
+        try:
+            return self._mapper_cache[k]
+        except KeyError:
+            ms = chr_data_to_mappers(self.to_chr_data(cs, hap))
+            self._mapper_cache[k] = ms
+            return ms
 
     def init_mapper(self, cs: BuildChrs, hap: Haplotype) -> bed.InitMapper:
-        return {d.name: d.idx for d in self.to_chr_data(cs, hap)}
+        return self._mappers(cs, hap)[0]
 
     def final_mapper(self, cs: BuildChrs, hap: Haplotype) -> bed.FinalMapper:
-        return {d.idx: d.name for d in self.to_chr_data(cs, hap)}
+        return self._mappers(cs, hap)[1]
 
 
 class DipChrPattern(BaseModel, ChrPattern):
@@ -2486,79 +2719,150 @@ class DipChrPattern(BaseModel, ChrPattern):
         mat={ChrIndex.CHRY},
     )
 
+    # memo for 'to_chr_data' (see HapChrPattern)
+    _chr_data_cache: dict[BuildChrs, list[ChrData]] = PrivateAttr(default_factory=dict)
+
+    # memo for '_mappers' (see HapChrPattern)
+    _mapper_cache: dict[BuildChrs, Mappers] = PrivateAttr(default_factory=dict)
+
+    # the template with the haplotype name filled in and split around the chr
+    # index placeholder, per haplotype (see HapChrPattern)
+    _template_parts: dict[Haplotype, tuple[str, str]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    # 'exclusions' as a bitmask per haplotype (see HapChrPattern)
+    _exclusion_masks: tuple[int, int] | None = PrivateAttr(None)
+
     @validator("template")
     def is_valid_template(cls, v: str) -> str:
-        assert (
-            v.count(CHR_INDEX_PLACEHOLDER) == 1 and v.count(CHR_HAP_PLACEHOLDER) == 1
-        ), "chr template must have '%i' and '%h' in it"
+        if v.count(CHR_INDEX_PLACEHOLDER) != 1 or v.count(CHR_HAP_PLACEHOLDER) != 1:
+            raise ValueError("chr template must have '%i' and '%h' in it")
         return v
 
     @validator("hapnames")
     def is_valid_hapname(cls, v: Diploid[HaplotypeName]) -> Diploid[HaplotypeName]:
         def is_valid(n: HaplotypeName, h: Haplotype) -> None:
-            t = CHR_INDEX_PLACEHOLDER in n or CHR_HAP_PLACEHOLDER in n
-            assert not t, f"name for {h.name} must not have '%i' and '%h' in it"
+            if CHR_INDEX_PLACEHOLDER in n or CHR_HAP_PLACEHOLDER in n:
+                raise ValueError(f"name for {h.name} must not have '%i' and '%h' in it")
 
         v.double.both(is_valid)
         return v
 
     def _is_excluded(self, i: ChrIndex, h: Haplotype) -> bool:
-        return i in self.exclusions.double.choose(h)
+        if (ms := self._exclusion_masks) is None:
+            ms = self._exclusion_masks = self.exclusions.double.both_(
+                chr_indices_to_mask
+            ).as_tuple
+        return bool(ms[h.value] >> i & 1)
 
     def filter_indices(self, cis: BuildChrs, h: Haplotype) -> HapChrs:
         return HapChrs({i for i in cis if not self._is_excluded(i, h)})
 
+    def _hap_template_parts(self, h: Haplotype) -> tuple[str, str]:
+        if (ps := self._template_parts.get(h)) is None:
+            # ASSUME the validators ensure there is exactly one index
+            # placeholder and that the hap names don't contain any
+            name = self.hapnames.double.choose(h)
+            t = self.template.replace(CHR_HAP_PLACEHOLDER, name)
+            pre, post = t.split(CHR_INDEX_PLACEHOLDER)
+            ps = self._template_parts[h] = (pre, post)
+        return ps
+
     def to_chr_name(self, i: ChrIndex, h: Haplotype) -> bed.ChrName | None:
         if self._is_excluded(i, h):
             return None
         elif i in self.special:
             return self.special[i]
         else:
-            name = self.hapnames.double.choose(h)
-            return bed.ChrName(
-                self.template.replace(
-                    CHR_INDEX_PLACEHOLDER,
-                    str(i.chr_name),
-                ).replace(
-                    CHR_HAP_PLACEHOLDER,
-                    name,
-                )
-            )
+            pre, post = self._hap_template_parts(h)
+            return bed.ChrName(sys.intern(f"{pre}{i.chr_name}{post}"))
 
     def to_chr_data(self, cs: BuildChrs) -> list[ChrData]:
         # order is really important here; we want to iterate through the first
         # haplotype before the second so that the chromosome order is like
         # chr1_mat, chr2_mat ... chr1_pat, chr2_pat rather than chr1_mat,
         # chr1_pat ... etc
-        return [
-            ChrData(c.to_internal_index(h), n, c.chr_name, h)
-            for h in Haplotype
-            for c in sort_chr_indices(self.filter_indices(cs, h))
-            if (n := self.to_chr_name(c, h)) is not None
-        ]
+        k = BuildChrs(frozenset(cs))
+        try:
+            return self._chr_data_cache[k]
+        except KeyError:
+            # NOTE this is 'to_chr_name' unrolled with the per-haplotype lookups
+            # (exclusions and template) pulled out of the inner loop
+            ds: list[ChrData] = []
+            special = self.special
+            for h in Haplotype:
+                pre, post = self._hap_template_parts(h)
+                excluded = self.exclusions.double.choose(h)
+                for c in sort_chr_indices(HapChrs(set(k - excluded))):
+                    n = (
+                        special[c]
+                        if c in special
+                        else bed.ChrName(sys.intern(f"{pre}{c.chr_name}{post}"))
+                    )
+                    ds.append(ChrData(c.to_internal_index(h), n, c.chr_name, h))
+            self._chr_data_cache[k] = ds
+            return ds
 
     def to_names(self, cs: BuildChrs) -> OrderedHapChrNames:
-        return OrderedHapChrNames([bed.ChrName(x[1]) for x in self.to_chr_data(cs)])
+        return OrderedHapChrNames([x.name for x in self.to_chr_data(cs)])
+
+    def _mappers(self, cs: BuildChrs) -> Mappers:
+        k = BuildChrs(frozenset(cs))
+        try:
+            return self._mapper_cache[k]
+        except KeyError:
+            ms = chr_data_to_mappers(self.to_chr_data(cs))
+            self._mapper_cache[k] = ms
+            return ms
 
     def init_mapper(self, cs: BuildChrs) -> bed.InitMapper:
-        return {d.name: d.idx for d in self.to_chr_data(cs)}
+        return self._mappers(cs)[0]
 
     def final_mapper(self, cs: BuildChrs) -> bed.FinalMapper:
-        return {d.idx: d.name for d in self.to_chr_data(cs)}
+        return self._mappers(cs)[1]
 
     def to_hap_pattern(self, hap: Haplotype) -> HapChrPattern:
+        # ASSUME this pattern has already been validated, which implies the
+        # derived haploid pattern is also valid, so skip validation here
         hs = self.hapnames.double.choose(hap)
-        return HapChrPattern(
+        return HapChrPattern.construct(
             template=self.template.replace(CHR_HAP_PLACEHOLDER, hs),
             special=self.special,
             exclusions=self.exclusions.double.choose(hap),
         )
 
 
+# Default chromosome patterns for each source type. Pydantic will deep copy a
+# plain default for every model it makes, so hand out these (frozen) instances
+# via factories instead. This also means that every source using a default
+# pattern will share the same chr data/mapper caches.
+_DEFAULT_HAP_CHR_PATTERN = HapChrPattern()
+
+_DEFAULT_DIP1_CHR_PATTERN = DipChrPattern()
+
+_DEFAULT_DIP2_CHR_PATTERN: Diploid[HapChrPattern] = Diploid(
+    pat=HapChrPattern(
+        template="chr%i_PATERNAL",
+        exclusions=[ChrIndex.CHRX],
+    ),
+    mat=HapChrPattern(
+        template="chr%i_MATERNAL",
+        exclusions=[ChrIndex.CHRY],
+    ),
+)
+
+
 class HapSrc(GenericDocumentable1, Generic[S]):
     """Specification for a haploid source file."""
 
-    chr_pattern_: HapChrPattern = Field(HapChrPattern(), alias="chr_pattern")
+    # constant tag for dispatching on hap/dip1/dip2 without isinstance checks
+    # (mypy can narrow a union on these since they are literals)
+    ploidy: ClassVar[Literal[0]] = 0
+    chr_pattern_: HapChrPattern = Field(
+        default_factory=lambda: _DEFAULT_HAP_CHR_PATTERN,
+        alias="chr_pattern",
+    )
     hap: S
 
     def chr_conversion(
@@ -2604,7 +2908,11 @@ class Dip1Src(GenericDocumentable1, Generic[S]):
     chromosome name.
     """
 
-    chr_pattern_: DipChrPattern = Field(DipChrPattern(), alias="chr_pattern")
+    ploidy: ClassVar[Literal[1]] = 1
+    chr_pattern_: DipChrPattern = Field(
+        default_factory=lambda: _DEFAULT_DIP1_CHR_PATTERN,
+        alias="chr_pattern",
+    )
     dip: S
 
     @property
@@ -2669,18 +2977,10 @@ class Dip2Src(GenericDocumentable2, Generic[S]):
     matched according to its corresponding entry in `chr_pattern`.
     """
 
+    ploidy: ClassVar[Literal[2]] = 2
     # TODO this could be cleaner (don't make one hap nested and the other flat)
     chr_pattern_: Diploid[HapChrPattern] = Field(
-        Diploid(
-            pat=HapChrPattern(
-                template="chr%i_PATERNAL",
-                exclusions=[ChrIndex.CHRX],
-            ),
-            mat=HapChrPattern(
-                template="chr%i_MATERNAL",
-                exclusions=[ChrIndex.CHRY],
-            ),
-        ),
+        default_factory=lambda: _DEFAULT_DIP2_CHR_PATTERN,
         alias="chr_pattern",
     )
     pat: S
@@ -2802,8 +3102,15 @@ class HapBedCoords(BaseModel):
 
     hap: HapBedLines
 
+    # memo for 'lines' since the coordinates are frozen (one per haplotype)
+    _lines: dict[Haplotype, Single[list[bed.IndexedBedLine]]] = PrivateAttr(
+        default_factory=dict
+    )
+
     def lines(self, h: Haplotype) -> Single[list[bed.IndexedBedLine]]:
-        return Single(elem=[x.line(h) for x in self.hap.lines])
+        if (ls := self._lines.get(h)) is None:
+            ls = self._lines[h] = Single(elem=[x.line(h) for x in self.hap.lines])
+        return ls
 
     @property
     def lines_nohap(self) -> Single[list[bed.IndexedBedLine]]:
@@ -2815,9 +3122,14 @@ class Dip1BedCoords(BaseModel):
 
     dip: DipBedLines
 
+    # memo for 'lines' (see HapBedCoords)
+    _lines: Single[list[bed.IndexedBedLine]] | None = PrivateAttr(None)
+
     @property
     def lines(self) -> Single[list[bed.IndexedBedLine]]:
-        return Single(elem=[x.line for x in self.dip.lines])
+        if (ls := self._lines) is None:
+            ls = self._lines = Single(elem=[x.line for x in self.dip.lines])
+        return ls
 
 
 class Dip2BedCoords(Diploid[HapBedLines]):
@@ -2826,9 +3138,16 @@ class Dip2BedCoords(Diploid[HapBedLines]):
     pat: HapBedLines
     mat: HapBedLines
 
+    # memo for 'lines' (see HapBedCoords)
+    _lines: Double[list[bed.IndexedBedLine]] | None = PrivateAttr(None)
+
     @property
     def lines(self) -> Double[list[bed.IndexedBedLine]]:
-        return self.double.both(lambda p, hap: [c.line(hap) for c in p.lines])
+        if (ls := self._lines) is None:
+            ls = self._lines = self.double.both(
+                lambda p, hap: [c.line(hap) for c in p.lines]
+            )
+        return ls
 
 
 # TODO make this mandatory
@@ -2916,31 +3235,12 @@ class BedColumns(BaseModel):
     start: NonNegativeInt = 1
     end: NonNegativeInt = 2
 
-    @validator("start")
-    def start_different(
-        cls,
-        v: NonNegativeInt,
-        values: dict[str, int],
-    ) -> NonNegativeInt:
-        try:
-            assert values["chr"] != v, "Bed columns must be different"
-        except KeyError:
-            pass
-        return v
-
-    @validator("end")
-    def end_different(
-        cls,
-        v: NonNegativeInt,
-        values: dict[str, int],
-    ) -> NonNegativeInt:
-        try:
-            assert (
-                values["chr"] != v and values["start"] != v
-            ), "Bed columns must be different"
-        except KeyError:
-            pass
-        return v
+    # NOTE skip if any field failed, in which case it won't be in 'values'
+    @root_validator(skip_on_failure=True)
+    def columns_different(cls, values: dict[str, int]) -> dict[str, int]:
+        cols = {values["chr"], values["start"], values["end"]}
+        assert len(cols) == 3, "Bed columns must be different"
+        return values
 
     def assert_different(self, x: int) -> None:
         assert (
@@ -3148,20 +3448,21 @@ class XYPar(BaseModel):
         "The PAR coordinates were specified manually in the pipeline configuration."
     )
 
-    @validator("start", "end")
-    def positive_region(cls, v: tuple[int, int]) -> tuple[int, int]:
-        assert v[1] > v[0], "End must be greater than start"
-        return v
+    # NOTE skip if any field failed, in which case it won't be in 'values'
+    @root_validator(skip_on_failure=True)
+    def positive_regions(
+        cls, values: dict[str, tuple[int, int]]
+    ) -> dict[str, tuple[int, int]]:
+        (s0, s1), (e0, e1) = values["start"], values["end"]
+        if s1 <= s0 or e1 <= e0:
+            raise ValueError("End must be greater than start")
+        return values
 
     def fmt(self, i: ChrIndex, pattern: HapChrPattern) -> str:
         # TODO this smells like something I'll be doing alot
         c = pattern.to_chr_name(i)
-        return "\n".join(
-            [
-                f"{c}\t{self.start[0]}\t{self.start[1]}",
-                f"{c}\t{self.end[0]}\t{self.end[1]}",
-            ]
-        )
+        (s0, s1), (e0, e1) = self.start, self.end
+        return f"{c}\t{s0}\t{s1}\n{c}\t{e0}\t{e1}"
 
 
 class XY(BaseModel):
@@ -3248,6 +3549,11 @@ class GCParams(BaseModel):
         (85, False),
     ]
 
+    # memos for the sorted bounds and their fractions (low and high
+    # respectively); the model is frozen so these will never go stale
+    _sorted: tuple[list[GCBound], list[GCBound]] | None = PrivateAttr(None)
+    _fractions: tuple[list[int], list[int]] | None = PrivateAttr(None)
+
     @validator("low", "high")
     def non_empty_range(cls, rng: list[GCBound]) -> list[GCBound]:
         try:
@@ -3273,21 +3579,35 @@ class GCParams(BaseModel):
             pass
         return high
 
+    def _get_sorted(self) -> tuple[list[GCBound], list[GCBound]]:
+        if (s := self._sorted) is None:
+            s = self._sorted = (
+                sorted(self.low, key=lambda x: x[0]),
+                sorted(self.high, key=lambda x: x[0]),
+            )
+        return s
+
+    def _get_fractions(self) -> tuple[list[int], list[int]]:
+        if (f := self._fractions) is None:
+            lo, hi = self._get_sorted()
+            f = self._fractions = ([x[0] for x in lo], [x[0] for x in hi])
+        return f
+
     @property
     def low_sorted(self) -> list[GCBound]:
-        return sorted(self.low, key=lambda x: x[0])
+        return self._get_sorted()[0]
 
     @property
     def high_sorted(self) -> list[GCBound]:
-        return sorted(self.high, key=lambda x: x[0])
+        return self._get_sorted()[1]
 
     @property
     def low_fractions(self) -> list[int]:
-        return [x[0] for x in self.low_sorted]
+        return self._get_fractions()[0]
 
     @property
     def high_fractions(self) -> list[int]:
-        return [x[0] for x in self.high_sorted]
+        return self._get_fractions()[1]
 
     # NOTE these assume that the low/high lists are non-empty
     @property
@@ -3301,6 +3621,10 @@ class GCParams(BaseModel):
         return (bounds[-1], bounds[:-1])
 
 
+# lengths, mismatches, and indels for each set of mappability params
+LowMapParamLists = tuple[list[int], list[int], list[int]]
+
+
 class Include(BaseModel):
     """Flags to control which stratification levels are included."""
 
@@ -3313,10 +3637,10 @@ class Include(BaseModel):
     vdj: bool = True
     mhc: bool = False  # default to false since this isn't implemented yet
     kir: bool = False  # ditto
-    mappability: set[LowMapParams] = {
+    mappability: tuple[LowMapParams, ...] = (
         LowMapParams(length=250, mismatches=0, indels=0),
         LowMapParams(length=100, mismatches=2, indels=1),
-    }
+    )
     gc: GCParams | None = GCParams()
     # NOTE: This is crude but it should a) work, b) provide a decent user xp
     # and c) typecheck nicely without requiring me to use a zillionth typevar
@@ -3332,6 +3656,24 @@ class Include(BaseModel):
     # not hurt anything.
     hets: set[int] = {100, 250, 500, 1000, 5000, 10000, 25000, 50000, 100000}
 
+    # memo for 'mappability_params' (the model is frozen so this won't change)
+    _mappability_params: LowMapParamLists | None = PrivateAttr(None)
+
+    # this used to be a set, so keep the duplicate removal (but in order)
+    @validator("mappability")
+    def unique_mappability(
+        cls, v: tuple[LowMapParams, ...]
+    ) -> tuple[LowMapParams, ...]:
+        return tuple(dict.fromkeys(v))
+
+    @property
+    def mappability_params(self) -> LowMapParamLists:
+        if (ps := self._mappability_params) is None:
+            ms = self.mappability
+            ps = unzip3([(m.length, m.mismatches, m.indels) for m in ms])
+            self._mappability_params = ps
+        return ps
+
 
 class OtherBedFile(GenericModel, Generic[BedSrcT, BedCoordsT]):
     """A bed file that is imported with minimal processing and included as-is
@@ -3423,6 +3765,13 @@ class Build(GenericModel, Generic[BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     malloc: Malloc | None = None
     bigbed: bool = False
 
+    @validator("other_strats", pre=True)
+    def intern_other_keys(cls, v: Any) -> Any:
+        # NOTE level/strat keys are looked up from wildcards like ref/build keys
+        if isinstance(v, dict):
+            return {k: intern_keys(x) for k, x in intern_keys(v).items()}
+        return v
+
     @validator("other_strats")
     def valid_other(
         cls,
@@ -3527,6 +3876,9 @@ class RefData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     an interface for downstream processing. It also is typed generically such
     that mypy can make inferences regarding its membership in hap/dip1/dip2.
 
+    NOTE: the config is never modified after parsing, so the properties here
+    are cached (this is a frozen dataclass without slots, so 'cached_property'
+    can still write to the instance dict).
     """
 
     refkey: RefKey
@@ -3534,17 +3886,23 @@ class RefData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     strat_inputs: StratInputs[BedSrcT, BedCoordsT]
     builds: dict[BuildKey, Build[BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]]
 
-    @property
+    # memo for 'to_build_data' so each build only gets one build data object
+    # (and thus its cached properties are only computed once)
+    _build_data_cache: dict[
+        BuildKey, BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
+    ] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @cached_property
     def ref_refkeys(self) -> RefKeyFull1or2:
         "The list of full refkeys for the reference (either one or two)"
         return to_refkeys(self.ref.src, self.refkey)
 
-    @property
+    @cached_property
     def ref_str_refkeys(self) -> RefKeyFullS1or2:
         "Like 'ref_refkeys' but returns strings."
         return to_str_refkeys(self.ref.src, self.refkey)
 
-    @property
+    @cached_property
     def mappability_patterns(self) -> list[str]:
         """List of mappability patterns for use in filtering extra contigs.
 
@@ -3555,6 +3913,14 @@ class RefData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
             self.strat_inputs.mappability,
         )
 
+    @cached_property
+    def xy_feature_srcs(self) -> tuple[BedSrc, BedSrc]:
+        """The X and Y features sources (in that order).
+
+        Throw DesignError if XY features are not given."""
+        f = self.strat_inputs.xy_features_unsafe
+        return (f.x_bed.bed.src.elem, f.y_bed.bed.src.elem)
+
     def to_build_data_unsafe(
         self,
         bk: BuildKey,
@@ -3571,9 +3937,15 @@ class RefData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     ) -> "BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT] | None":
         "Lookup a given build with a build key"
         try:
-            return BuildData_(self, bk, self.builds[bk])
+            return self._build_data_cache[bk]
+        except KeyError:
+            pass
+        try:
+            bd = BuildData_(self, bk, self.builds[bk])
         except KeyError:
             return None
+        self._build_data_cache[bk] = bd
+        return bd
 
     def get_refkeys(self, f: RefDataToSrc) -> RefKeyFullS1or2 | None:
         """
@@ -3594,17 +3966,17 @@ class RefData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
             f(self.strat_inputs),
         )
 
-    @property
+    @cached_property
     def has_low_complexity_rmsk(self) -> bool:
         """Return True if this reference has repeat masker specified."""
         return self.strat_inputs.low_complexity.rmsk is not None
 
-    @property
+    @cached_property
     def has_low_complexity_simreps(self) -> bool:
         """Return True if this reference has simple repeats specified."""
         return self.strat_inputs.low_complexity.simreps is not None
 
-    @property
+    @cached_property
     def has_low_complexity_censat(self) -> bool:
         """Return True if this reference has satellites specified."""
         return self.strat_inputs.low_complexity.satellites is not None
@@ -3621,14 +3993,15 @@ AnyRefData = HapRefData | Dip1RefData | Dip2RefData
 class BuildData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     """A helper class corresponding a given build.
 
-    This follows a similar motivation as 'RefData_' above.
+    This follows a similar motivation as 'RefData_' above (including cached
+    properties).
     """
 
     refdata: RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
     buildkey: BuildKey
     build: Build[BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
 
-    @property
+    @cached_property
     def build_chrs(self) -> BuildChrs:
         """Return a set of all desired chromosomes for this build.
 
@@ -3637,50 +4010,55 @@ class BuildData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
         the paternal) this set will NOT reflect that exclusion.
         """
         cs = self.build.chr_filter
-        return BuildChrs(set([x for x in ChrIndex]) if len(cs) == 0 else cs)
+        return BuildChrs(ALL_CHR_INDICES if len(cs) == 0 else frozenset(cs))
 
-    @property
-    def chr_indices(self) -> set[ChrIndex]:
+    @cached_property
+    def xy_build_chrs(self) -> BuildChrs:
+        """Like 'build_chrs' but only with the X and/or Y (if present)."""
+        return BuildChrs(self.build_chrs & XY_CHR_INDICES)
+
+    @cached_property
+    def chr_indices(self) -> frozenset[ChrIndex]:
         cs = self.build.chr_filter
-        return set([x for x in ChrIndex]) if len(cs) == 0 else cs
+        return ALL_CHR_INDICES if len(cs) == 0 else frozenset(cs)
 
-    @property
+    @cached_property
     def want_bb(self) -> bool:
         return self.build.bigbed
 
-    @property
+    @cached_property
     def want_diploid(self) -> bool:
         return len(self.build.include.hets) > 0
 
-    @property
+    @cached_property
     def want_low_complexity(self) -> bool:
         return self.build.include.low_complexity
 
-    @property
+    @cached_property
     def want_gc(self) -> bool:
         return self.build.include.gc is not None
 
-    @property
+    @cached_property
     def want_telomeres(self) -> bool:
         return self.build.include.telomeres
 
-    @property
+    @cached_property
     def want_segdups(self) -> bool:
         return self.build.include.segdups
 
-    @property
+    @cached_property
     def want_union(self) -> bool:
         return self.build.include.union
 
-    @property
+    @cached_property
     def have_gaps(self) -> bool:
         return self.refdata.strat_inputs.gap is not None
 
-    @property
+    @cached_property
     def have_benchmark(self) -> bool:
         return self.build.bench is not None
 
-    @property
+    @cached_property
     def want_hets(self) -> bool:
         r = self.refdata.ref
         if isinstance(r, HapSrc):
@@ -3690,14 +4068,11 @@ class BuildData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
         else:
             assert_never(r)
 
-    @property
-    def mappability_params(
-        self,
-    ) -> tuple[list[int], list[int], list[int]]:
-        ms = self.build.include.mappability
-        return unzip3([(m.length, m.mismatches, m.indels) for m in ms])
+    @cached_property
+    def mappability_params(self) -> LowMapParamLists:
+        return self.build.include.mappability_params
 
-    @property
+    @cached_property
     def want_mappability(self) -> bool:
         return len(self.build.include.mappability) > 0
 
@@ -3707,9 +4082,9 @@ class BuildData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     # TODO technically this isn't true because the autosomes could in theory be
     # excluded for each haplotype separately, but this should almost never happen
     # in real life (see vdj below)
-    @property
+    @cached_property
     def want_xy_auto(self) -> bool:
-        return len(self.build_chrs - set([ChrIndex.CHRX, ChrIndex.CHRY])) > 0
+        return len(self.build_chrs - XY_CHR_INDICES) > 0
 
     # For each of these we could check if the X or Y chromosome(s) is/are
     # present in the chr filter. However, this would require
@@ -3717,25 +4092,25 @@ class BuildData_(Generic[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]):
     # it is much easier to query the refkey and buildkey for the desired xy
     # chromosomes, inherit rules based on this, and then filter those rules
     # based on the following functions.
-    @property
+    @cached_property
     def have_y_PAR(self) -> bool:
         return self.refdata.strat_inputs.xy.y_par is not None
 
-    @property
+    @cached_property
     def want_cds(self) -> bool:
         return self.build.include.cds
 
-    @property
+    @cached_property
     def want_mhc(self) -> bool:
         return self.build.include.mhc and MHC_CHR in self.build_chrs
 
-    @property
+    @cached_property
     def want_kir(self) -> bool:
         return self.build.include.kir and KIR_CHR in self.build_chrs
 
-    @property
+    @cached_property
     def want_vdj(self) -> bool:
-        return self.build.include.vdj and len(VDJ_CHRS & self.build_chrs) > 0
+        return self.build.include.vdj and not VDJ_CHRS.isdisjoint(self.build_chrs)
 
 
 class Stratification(
@@ -3747,6 +4122,10 @@ class Stratification(
     strat_inputs: StratInputs[BedSrcT, BedCoordsT]
     builds: dict[BuildKey, Build[BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]]
 
+    @validator("builds", pre=True)
+    def intern_build_keys(cls, v: Any) -> Any:
+        return intern_keys(v)
+
 
 HapBuildData = BuildData_[
     HapRefFile,
@@ -3772,6 +4151,27 @@ Dip2BuildData = BuildData_[
 
 AnyBuildData = HapBuildData | Dip1BuildData | Dip2BuildData
 
+AllRefData = tuple[list[HapRefData], list[Dip1RefData], list[Dip2RefData]]
+
+AllBuildData = tuple[list[HapBuildData], list[Dip1BuildData], list[Dip2BuildData]]
+
+
+@dataclass(frozen=True)
+class BedIOFunctions(Generic[X]):
+    """The functions to dispatch in 'with_build_data_and_bed_io'.
+
+    There is one function for each combination of reference and bed file
+    haplotype configuration. Each takes the input(s), the output path(s), the
+    build data, and the bed file.
+    """
+
+    hap: Callable[[X, Path, HapBuildData, HapBedFile], list[Path]]
+    dip1to1: Callable[[X, Path, Dip1BuildData, Dip1BedFile], list[Path]]
+    dip1to2: Callable[[X, Double[Path], Dip2BuildData, Dip1BedFile], list[Path]]
+    dip2to1: Callable[[Double[X], Path, Dip1BuildData, Dip2BedFile], list[Path]]
+    dip2to2: Callable[[Double[X], Double[Path], Dip2BuildData, Dip2BedFile], list[Path]]
+
+
 HapStrat = Stratification[
     HapRefFile,
     HapBedSrc,
@@ -3817,6 +4217,26 @@ FUNCTIONAL_TECH_DESC = (
 )
 
 
+def _memo_property(f: Callable[[GiabStrats], X]) -> Callable[[GiabStrats], X]:
+    """Memoize a property of 'GiabStrats' by its name.
+
+    These are used in nearly every rule (or every time snakemake evaluates
+    its targets) and the config never changes after it is parsed, so only
+    compute each one once.
+    """
+    k = f.__name__
+
+    @wraps(f)
+    def go(self: GiabStrats) -> X:
+        try:
+            return cast(X, self._property_cache[k])
+        except KeyError:
+            x = self._property_cache[k] = f(self)
+            return x
+
+    return go
+
+
 class GiabStrats(BaseModel):
     """Top level stratification object."""
 
@@ -3870,6 +4290,57 @@ class GiabStrats(BaseModel):
     malloc: Malloc = Malloc()
     docs: Documentation = Documentation()
 
+    # memo for 'to_build_data'; the config never changes after parsing, so a
+    # given refkey/buildkey pair will always map to the same build data
+    _build_data_cache: dict[tuple[RefKey, BuildKey], AnyBuildData] = PrivateAttr(
+        default_factory=dict
+    )
+
+    # memos for '_all_ref_data' and '_all_build_data' (same reasoning as above)
+    _all_ref_data_cache: AllRefData | None = PrivateAttr(None)
+    _all_build_data_cache: AllBuildData | None = PrivateAttr(None)
+
+    # memo for 'to_ref_data' (same reasoning as above)
+    _ref_index: dict[RefKey, AnyRefData] | None = PrivateAttr(None)
+
+    # memo for '_all_bed_build_and_refsrckeys' (same reasoning as above)
+    _bed_build_and_refsrckeys_cache: dict[
+        BuildDataToSrc, list[tuple[RefKeyFullS, BuildKey]]
+    ] = PrivateAttr(default_factory=dict)
+
+    # memos for the path and key properties below (same reasoning as above)
+    _property_cache: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _ref_dirs: RefDirs | None = PrivateAttr(None)
+
+    # memo for 'buildkey_to_vcf_src' (same reasoning as above)
+    _vcf_src_cache: dict[tuple[BuildDataToVCF, RefKeyFullS, BuildKey], BedSrc] = (
+        PrivateAttr(default_factory=dict)
+    )
+
+    # memo for 'refkey_is_dip1' (same reasoning as above)
+    _is_dip1_cache: dict[tuple[RefKeyFullS, bool, bool], bool] = PrivateAttr(
+        default_factory=dict
+    )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # NOTE snakemake pickles the config into every script job; the private
+        # attributes above are all memos, which are cheap to rebuild and may
+        # hold (or be keyed on) things that don't pickle, so send fresh ones
+        state = super().__getstate__()
+        state["__private_attribute_values__"] = {
+            k: v.get_default() for k, v in self.__private_attributes__.items()
+        }
+        return state
+
+    @validator(
+        "haploid_stratifications",
+        "diploid1_stratifications",
+        "diploid2_stratifications",
+        pre=True,
+    )
+    def intern_ref_keys(cls, v: Any) -> Any:
+        return intern_keys(v)
+
     @validator(
         "haploid_stratifications",
         "diploid1_stratifications",
@@ -3883,11 +4354,12 @@ class GiabStrats(BaseModel):
     ) -> AnyStrat:
         try:
             levels: list[OtherLevelDescription] = values["other_levels"]
-            assert OTHERDIFF_KEY not in [
-                x.key for x in levels
-            ], f"{OTHERDIFF_KEY} cannot be in other_levels"
+            keys = {x.key for x in levels}
+            assert (
+                OTHERDIFF_KEY not in keys
+            ), f"{OTHERDIFF_KEY} cannot be in other_levels"
 
-            _levels = [OTHERDIFF_KEY, *[x.key for x in levels]]
+            _levels = {OTHERDIFF_KEY, *keys}
 
             bad = [
                 f"level='{lk}'; build='{bk}'"
@@ -3921,9 +4393,9 @@ class GiabStrats(BaseModel):
                 for bk, b in v.builds.items()
                 if (c := b.comparison) is not None
                 for ck in (
-                    [c.other]
+                    (c.other,)
                     if isinstance(c, BuildCompare1)
-                    else [x.other for x in c.double.as_list]
+                    else (c.pat.other, c.mat.other)
                 )
                 if ck not in prev
             ]
@@ -3941,10 +4413,9 @@ class GiabStrats(BaseModel):
         values: dict[str, Any],
     ) -> dict[RefKey, Dip2Strat]:
         try:
-            hap: list[RefKey] = list(values["haploid_stratifications"])
-            dip1: list[RefKey] = list(values["diploid2_stratifications"])
-            dip2 = list(v)
-            ds = list(duplicates_everseen(hap + dip1 + dip2))
+            hap: dict[RefKey, HapStrat] = values["haploid_stratifications"]
+            dip1: dict[RefKey, Dip1Strat] = values["diploid1_stratifications"]
+            ds = list(duplicates_everseen(chain(hap, dip1, v)))
             assert len(ds) == 0, f"duplicate refkeys: {', '.join(ds)}"
         except KeyError:
             pass
@@ -3968,82 +4439,102 @@ class GiabStrats(BaseModel):
     # file paths
 
     @property
+    @_memo_property
     def resources_dir(self) -> Path:
         return self.paths.resources
 
     @property
+    @_memo_property
     def _tools_base_dir(self) -> Path:
         return self.resources_dir / "tools"
 
     @property
+    @_memo_property
     def tools_src_dir(self) -> Path:
         return self._tools_base_dir / "src"
 
     @property
+    @_memo_property
     def tools_make_dir(self) -> Path:
         return self._tools_base_dir / "make"
 
     @property
+    @_memo_property
     def tools_bin_dir(self) -> Path:
         return self._tools_base_dir / "bin"
 
     @property
+    @_memo_property
     def ref_src_dir(self) -> Path:
         return self.resources_dir / "{ref_src_key}"
 
     @property
+    @_memo_property
     def results_dir(self) -> Path:
         return self.paths.results
 
     @property
+    @_memo_property
     def final_root_dir(self) -> Path:
         return self.results_dir / "final"
 
     @property
+    @_memo_property
     def final_build_dir(self) -> Path:
         return self.final_root_dir / "{ref_final_key}@{build_key}"
 
     @property
+    @_memo_property
     def intermediate_root_dir(self) -> Path:
         return self.results_dir / "intermediates"
 
     @property
+    @_memo_property
     def intermediate_build_hapless_dir(self) -> Path:
         return self.intermediate_root_dir / "{ref_key}@{build_key}"
 
     @property
+    @_memo_property
     def intermediate_build_dir(self) -> Path:
         return self.intermediate_root_dir / "{ref_final_key}@{build_key}"
 
     @property
+    @_memo_property
     def bench_root_dir(self) -> Path:
         return self.results_dir / "bench"
 
     @property
+    @_memo_property
     def log_tools_dir(self) -> Path:
         return self.resources_dir / "log" / "tools"
 
     @property
+    @_memo_property
     def log_src_dir(self) -> Path:
         return self.resources_dir / "log" / "{ref_src_key}"
 
     @property
+    @_memo_property
     def log_results_dir(self) -> Path:
         return self.results_dir / "log" / "{ref_final_key}"
 
     @property
+    @_memo_property
     def log_build_dir(self) -> Path:
         return self.log_results_dir / "builds" / "{ref_final_key}@{build_key}"
 
     @property
+    @_memo_property
     def log_build_hapless_dir(self) -> Path:
         return self.log_results_dir / "builds" / "{ref_key}@{build_key}"
 
     @property
+    @_memo_property
     def bench_build_dir(self) -> Path:
         return self.bench_root_dir / "{ref_final_key}@{build_key}"
 
     @property
+    @_memo_property
     def bench_build_hapless_dir(self) -> Path:
         return self.bench_root_dir / "{ref_key}@{build_key}"
 
@@ -4061,6 +4552,11 @@ class GiabStrats(BaseModel):
 
     @property
     def ref_dirs(self) -> RefDirs:
+        if (d := self._ref_dirs) is None:
+            d = self._ref_dirs = self._make_ref_dirs()
+        return d
+
+    def _make_ref_dirs(self) -> RefDirs:
         return RefDirs(
             src=RefSrcDirs(
                 reference=DataLogDirs(
@@ -4163,10 +4659,16 @@ class GiabStrats(BaseModel):
         rk: RefKeyFullS,
         bk: BuildKey,
     ) -> HapChrs:
-        cis = self.buildkey_to_chrs(rk, bk, False, False)
-        # NOTE order matters here since this will be used to create sorted bed
-        # files
-        return HapChrs({i for i in [ChrIndex.CHRX, ChrIndex.CHRY] if i in cis})
+        # NOTE this is 'buildkey_to_chrs' (with split/nohap off) restricted to
+        # the X and Y; filtering is per chromosome so it is cheaper to only
+        # filter these two rather than every chromosome in the build
+        return self.with_build_data_full(
+            rk,
+            bk,
+            lambda bd: bd.refdata.ref.hap_chrs(bd.xy_build_chrs),
+            lambda bd: bd.refdata.ref.all_chrs(bd.xy_build_chrs),
+            lambda hap, bd: bd.refdata.ref.hap_chrs(bd.xy_build_chrs, hap),
+        )
 
     def buildkey_to_wanted_xy_names(
         self,
@@ -4181,10 +4683,8 @@ class GiabStrats(BaseModel):
         bk: BuildKey,
         f: Callable[[Malloc], int],
     ) -> int:
-        bd = self.to_build_data(strip_full_refkey(rk), bk)
-        return max(
-            fmap_maybe_def(f(self.malloc), lambda m: f(m), bd.build.malloc), 1000
-        )
+        m = self.to_build_data(strip_full_refkey(rk), bk).build.malloc
+        return max(f(self.malloc if m is None else m), 1000)
 
     def buildkey_to_ref_mappers(
         self, rk: RefKeyFullS, bk: BuildKey
@@ -4246,14 +4746,7 @@ class GiabStrats(BaseModel):
         two inputs which may or may not have a haplotype associated with them,
         this function provides the full refkeys for obtaining said inputs.
         """
-        # TODO this seems like a useful glue function (the labmda that is)
-        return self.to_ref_data(rk).get_refkeys(
-            lambda rd: (
-                None
-                if (bf := f(rd.strat_inputs)) is None
-                else (bf.bed.src if isinstance(bf, BedFile) else None)
-            )
-        )
+        return self.to_ref_data(rk).get_refkeys(si_to_bed_src_getter(f))
 
     def refkey_to_bed_refsrckeys_smk(
         self, f: StratInputToBed, rk: RefKey
@@ -4274,21 +4767,11 @@ class GiabStrats(BaseModel):
 
     def refsrckey_to_bed_src(self, f: StratInputToBed, rk: RefKeyFullS) -> BedSrc:
         """Lookup a haplotype-specific bed file source with the given function."""
-        return self._refkey_to_src(
-            lambda rd: (
-                b.bed.src
-                if (b := f(rd.strat_inputs)) is not None and isinstance(b, BedFile)
-                else raise_inline()
-            ),
-            rk,
-        )
+        return self._refkey_to_src(si_to_bed_src_getter(f), rk)
 
     def _refsrckey_to_xy_feature_src(self, rsk: RefKeyFullS, i: ChrIndex) -> BedSrc:
-        return (
-            self.to_ref_data(strip_full_refkey(rsk))
-            .strat_inputs.xy_feature_bed_unsafe(i)
-            .bed.src.elem
-        )
+        x, y = self.to_ref_data(strip_full_refkey(rsk)).xy_feature_srcs
+        return choose_xy_unsafe(i, x, y)
 
     def refsrckey_to_x_features_src(self, rsk: RefKeyFullS) -> BedSrc:
         """Return the X features source file for a given reference."""
@@ -4316,15 +4799,7 @@ class GiabStrats(BaseModel):
 
         Used for looking up benchmark files for each build.
         """
-        # TODO this "update" function is not DRY
-        # return self.refkey_to_bed_refsrckeys(lambda rd: f(rd.to_build_data(bk)), rk)
-        return self.to_ref_data(rk).get_refkeys(
-            lambda rd: (
-                None
-                if (bf := f(rd.to_build_data(bk))) is None
-                else (bf.bed.src if isinstance(bf, BedFile) else None)
-            )
-        )
+        return self.to_ref_data(rk).get_refkeys(bd_to_bed_src_getter(f, bk))
 
     def buildkey_to_bed_refsrckeys_smk(
         self, f: BuildDataToBed, rk: RefKey, bk: BuildKey
@@ -4342,26 +4817,29 @@ class GiabStrats(BaseModel):
 
         Used for looking up benchmark sources for each build.
         """
-        return self._refkey_to_src(
-            lambda rd: (
-                b.bed.src
-                if (b := f(rd.to_build_data(bk))) is not None and isinstance(b, BedFile)
-                else raise_inline()
-            ),
-            rk,
-        )
+        return self._refkey_to_src(bd_to_bed_src_getter(f, bk), rk)
 
     def buildkey_to_vcf_src(
         self, f: BuildDataToVCF, rk: RefKeyFullS, bk: BuildKey
     ) -> BedSrc:
-        """Like 'buildkey_to_bed_src' but for benchmark VCF sources."""
+        """Like 'buildkey_to_bed_src' but for benchmark VCF sources.
+
+        The result is memoized per function/refkey/buildkey, so 'f' should be
+        a named function and not a lambda.
+        """
+        k = (f, rk, bk)
+        try:
+            return self._vcf_src_cache[k]
+        except KeyError:
+            pass
         # TODO not DRY
         rk_, hap = parse_full_refkey(rk)
         bd = self.to_build_data(rk_, bk)
         src = with_build_data(bd, lambda bd: f(bd), lambda bd: f(bd), lambda bd: f(bd))
         if src is None:
             raise DesignError()
-        return from_single_or_double(src.vcf.src, hap)
+        r = self._vcf_src_cache[k] = from_single_or_double(src.vcf.src, hap)
+        return r
 
     def refkey_to_normalization_path(self, rk: RefKeyFullS, s: IO[bytes]) -> Path:
         """Return a list of paths for a given normalization checkpoint.
@@ -4375,31 +4853,40 @@ class GiabStrats(BaseModel):
         's' is an open stream representing the output path from the checkpoint.
         """
         res = json.load(s)
-        try:
-            paths = [Path(p) for p in res]
-        except TypeError:
+        # NOTE only validate here; build a Path for the one entry we return
+        if not isinstance(res, list) or not all(isinstance(p, str) for p in res):
             raise DesignError(f"Checkpoint does not have paths list, got {res}")
 
         return self.with_ref_data_full(
             rk,
-            lambda _: match1_unsafe(paths, noop),
-            lambda _: match1_unsafe(paths, noop),
-            lambda hap, _: match2_unsafe(paths, lambda p: p.choose(hap)),
+            lambda _: Path(match1_unsafe(res, noop)),
+            lambda _: Path(match1_unsafe(res, noop)),
+            lambda hap, _: Path(match2_unsafe(res, lambda p: p.choose(hap))),
         )
 
     def to_ref_data(self, rk: RefKey) -> AnyRefData:
         """Lookup refdata object for a given refkey."""
-        if rk in self.haploid_stratifications:
-            return to_ref_data_unsafe(self.haploid_stratifications, rk)
-        elif rk in self.diploid1_stratifications:
-            return to_ref_data_unsafe(self.diploid1_stratifications, rk)
-        elif rk in self.diploid2_stratifications:
-            return to_ref_data_unsafe(self.diploid2_stratifications, rk)
-        else:
+        if (i := self._ref_index) is None:
+            # ASSUME the validators ensure that the refkeys don't overlap
+            h, d1, d2 = self._all_ref_data
+            rds: list[AnyRefData] = [*h, *d1, *d2]
+            i = self._ref_index = {r.refkey: r for r in rds}
+        try:
+            return i[rk]
+        except KeyError:
             raise DesignError(f"invalid ref key: '{rk}'")
 
     def to_build_data(self, rk: RefKey, bk: BuildKey) -> AnyBuildData:
-        """Lookup builddata object for a given refkey and build key."""
+        """Lookup builddata object for a given refkey and build key.
+
+        The result is memoized per refkey/buildkey pair.
+        """
+        # NOTE check the memo before defining the dispatch functions below so
+        # that cache hits don't allocate any closures
+        try:
+            return self._build_data_cache[(rk, bk)]
+        except KeyError:
+            pass
 
         def hap(rd: HapRefData) -> AnyBuildData:
             return rd.to_build_data_unsafe(bk)
@@ -4410,7 +4897,9 @@ class GiabStrats(BaseModel):
         def dip2(rd: Dip2RefData) -> AnyBuildData:
             return rd.to_build_data_unsafe(bk)
 
-        return with_ref_data(self.to_ref_data(rk), hap, dip1, dip2)
+        bd = with_ref_data(self.to_ref_data(rk), hap, dip1, dip2)
+        self._build_data_cache[(rk, bk)] = bd
+        return bd
 
     def with_ref_data(
         self,
@@ -4519,38 +5008,16 @@ class GiabStrats(BaseModel):
         """Apply functions to ref data depending on if they are dip1/2/hap and
         depending on the refkey configuration (standard/split/nohap)
         """
-        match (split, nohap):
-            case (False, False):
-                return self.with_ref_data_full(
-                    rk,
-                    hap_f,
-                    dip1_f,
-                    dip2_f,
-                )
-            case (False, True):
-                return self.with_ref_data_full_nohap(
-                    rk,
-                    dip1_f,
-                    dip2_f,
-                )
-            case (True, False):
-                return self.with_ref_data_split_full(
-                    rk,
-                    hap_f,
-                    split_dip1_f,
-                    dip2_f,
-                )
-            case (True, True):
-                return self.with_ref_data_split_full_nohap(
-                    rk,
-                    split_dip1_f,
-                    dip2_f,
-                )
-            case _:
-                # TODO indeed this should never happen, and mypy currently is
-                # not smart enough to validate that this is the case:
-                # https://github.com/python/mypy/issues/16722
-                raise DesignError("This should never happen")
+        # NOTE branch on the flags directly rather than matching on a tuple of
+        # them; this is called for nearly every rule and it also means there
+        # is no impossible fallthrough case
+        if split:
+            if nohap:
+                return self.with_ref_data_split_full_nohap(rk, split_dip1_f, dip2_f)
+            return self.with_ref_data_split_full(rk, hap_f, split_dip1_f, dip2_f)
+        if nohap:
+            return self.with_ref_data_full_nohap(rk, dip1_f, dip2_f)
+        return self.with_ref_data_full(rk, hap_f, dip1_f, dip2_f)
 
     def with_build_data(
         self,
@@ -4659,42 +5126,16 @@ class GiabStrats(BaseModel):
         """Apply functions to build data depending on if they are dip1/2/hap and
         depending on the refkey configuration (standard/split/nohap)
         """
-        match (split, nohap):
-            case (False, False):
-                return self.with_build_data_full(
-                    rk,
-                    bk,
-                    hap_f,
-                    dip1_f,
-                    dip2_f,
-                )
-            case (False, True):
-                return self.with_build_data_full_nohap(
-                    rk,
-                    bk,
-                    dip1_f,
-                    dip2_f,
-                )
-            case (True, False):
-                return self.with_build_data_split_full(
-                    rk,
-                    bk,
-                    hap_f,
-                    split_dip1_f,
-                    dip2_f,
-                )
-            case (True, True):
+        # NOTE see 'with_ref_data_full_rconf'
+        if split:
+            if nohap:
                 return self.with_build_data_split_full_nohap(
-                    rk,
-                    bk,
-                    split_dip1_f,
-                    dip2_f,
+                    rk, bk, split_dip1_f, dip2_f
                 )
-            case _:
-                # TODO indeed this should never happen, and mypy currently is
-                # not smart enough to validate that this is the case:
-                # https://github.com/python/mypy/issues/16722
-                raise DesignError("This should never happen")
+            return self.with_build_data_split_full(rk, bk, hap_f, split_dip1_f, dip2_f)
+        if nohap:
+            return self.with_build_data_full_nohap(rk, bk, dip1_f, dip2_f)
+        return self.with_build_data_full(rk, bk, hap_f, dip1_f, dip2_f)
 
     def with_ref_data_and_bed(
         self,
@@ -4937,15 +5378,11 @@ class GiabStrats(BaseModel):
             [Path, Haplotype, Dip2BuildData, Dip2BedCoords], list[Path]
         ],
     ) -> list[Path]:
-        def write_output(ps: list[Path]) -> None:
-            with open(output, "w") as f:
-                json.dump([str(p) for p in ps], f)
-
         return self.with_build_data_and_bed_o2(
             rk,
             bk,
             lambda rk: sub_output_path(output_pattern, rk),
-            write_output,
+            partial(write_output_paths, output),
             get_bed_f,
             lambda o, bd, bf: (
                 hap_f(o, bd, bf) if not isinstance(bf, BedFile) else raise_inline()
@@ -4959,17 +5396,14 @@ class GiabStrats(BaseModel):
             lambda o, bd, bf: (
                 dip_2to1_f(o, bd, bf) if not isinstance(bf, BedFile) else raise_inline()
             ),
-            lambda o, bd, bf: [
-                y
-                for x in o.both(
-                    lambda o, hap: (
-                        dip_2to2_f(o, hap, bd, bf)
-                        if not isinstance(bf, BedFile)
-                        else raise_inline()
-                    )
-                ).as_list
-                for y in x
-            ],
+            lambda o, bd, bf: (
+                [
+                    *dip_2to2_f(o.pat, Haplotype.PAT, bd, bf),
+                    *dip_2to2_f(o.mat, Haplotype.MAT, bd, bf),
+                ]
+                if not isinstance(bf, BedFile)
+                else raise_inline()
+            ),
         )
 
     def with_build_data_and_bed_io(
@@ -4980,13 +5414,7 @@ class GiabStrats(BaseModel):
         output: Path,
         output_pattern: str,
         get_bed_f: BuildDataToBed,
-        hap_f: Callable[[X, Path, HapBuildData, HapBedFile], list[Path]],
-        dip_1to1_f: Callable[[X, Path, Dip1BuildData, Dip1BedFile], list[Path]],
-        dip_1to2_f: Callable[[X, Double[Path], Dip2BuildData, Dip1BedFile], list[Path]],
-        dip_2to1_f: Callable[[Double[X], Path, Dip1BuildData, Dip2BedFile], list[Path]],
-        dip_2to2_f: Callable[
-            [X, Path, Haplotype, Dip2BuildData, Dip2BedFile], list[Path]
-        ],
+        fs: BedIOFunctions[X],
     ) -> list[Path]:
         """Like 'with_build_data_and_bed_io2' with the following differences.
 
@@ -4999,35 +5427,27 @@ class GiabStrats(BaseModel):
         written instead of a function. The output list will be written as a json
         dump.
 
-        * here, the function corresponding to dip2->dip2 here only takes a
-        single haplotype, which is useful since the haplotypes can be processed
-        independently and thus the supplied function can be made less
-        redundant.
-
-        """
+        * The function corresponding to dip2->dip2 here is called once with both
+        haplotypes (inputs and outputs) rather than once per haplotype, which
+        allows it to share any setup (eg chromosome conversions) between the
+        two.
 
-        def write_output(ps: list[Path]) -> None:
-            with open(output, "w") as f:
-                json.dump([str(p) for p in ps], f)
+        * The five higher order functions are supplied together as one
+        'BedIOFunctions' object.
 
+        """
         return self.with_build_data_and_bed_io2(
             rk,
             bk,
             inputs,
             lambda rk: sub_output_path(output_pattern, rk),
-            write_output,
+            partial(write_output_paths, output),
             get_bed_f,
-            hap_f,
-            dip_1to1_f,
-            dip_1to2_f,
-            dip_2to1_f,
-            lambda i, o, bd, bf: [
-                y
-                for x in i.both(
-                    lambda i, hap: dip_2to2_f(i, o.choose(hap), hap, bd, bf)
-                ).as_list
-                for y in x
-            ],
+            fs.hap,
+            fs.dip1to1,
+            fs.dip1to2,
+            fs.dip2to1,
+            fs.dip2to2,
         )
 
     # TODO this really should be called "source_doc" or something
@@ -5173,33 +5593,55 @@ class GiabStrats(BaseModel):
 
     # final refkey/buildkey lists (for the "all" target and related)
 
+    # NOTE all ref data (and hence all build data) objects come from here so
+    # that there is only one object graph and each cached property on these
+    # objects is only computed once
+
+    @property
+    def _all_ref_data(self) -> AllRefData:
+        if self._all_ref_data_cache is None:
+            self._all_ref_data_cache = (
+                all_ref_data(self.haploid_stratifications),
+                all_ref_data(self.diploid1_stratifications),
+                all_ref_data(self.diploid2_stratifications),
+            )
+        return self._all_ref_data_cache
+
+    @property
+    def _all_build_data(self) -> AllBuildData:
+        if self._all_build_data_cache is None:
+            h, d1, d2 = self._all_ref_data
+            self._all_build_data_cache = (
+                all_build_data(h),
+                all_build_data(d1),
+                all_build_data(d2),
+            )
+        return self._all_build_data_cache
+
     @property
+    @_memo_property
     def all_build_keys(self) -> tuple[list[RefKey], list[BuildKey]]:
-        return unzip2(
-            all_build_keys(self.haploid_stratifications)
-            + all_build_keys(self.diploid1_stratifications)
-            + all_build_keys(self.diploid2_stratifications)
-        )
+        # NOTE read both columns straight off the build data rather than
+        # concatenating lists of pairs and unzipping them
+        h, d1, d2 = self._all_build_data
+        bds: list[AnyBuildData] = [*h, *d1, *d2]
+        return ([b.refdata.refkey for b in bds], [b.buildkey for b in bds])
 
     @property
+    @_memo_property
     def all_full_build_keys(self) -> tuple[list[RefKeyFullS], list[BuildKey]]:
-        return unzip2(
-            all_ref_build_keys(self.haploid_stratifications)
-            + all_ref_build_keys(self.diploid1_stratifications)
-            + all_ref_build_keys(self.diploid2_stratifications)
-        )
+        return unzip2(self.all_full_ref_and_build_keys)
 
     @property
+    @_memo_property
     def all_full_ref_and_build_keys(self) -> list[tuple[RefKeyFullS, BuildKey]]:
-        return (
-            all_ref_build_keys(self.haploid_stratifications)
-            + all_ref_build_keys(self.diploid1_stratifications)
-            + all_ref_build_keys(self.diploid2_stratifications)
-        )
+        h, d1, d2 = self._all_build_data
+        return all_ref_build_keys(h) + all_ref_build_keys(d1) + all_ref_build_keys(d2)
 
     # source refkey/buildkey lists (for the "all resources" rule)
 
     @property
+    @_memo_property
     def all_ref_refsrckeys(self) -> list[RefKeyFullS]:
         return (
             all_ref_refsrckeys(self.haploid_stratifications)
@@ -5210,98 +5652,23 @@ class GiabStrats(BaseModel):
     def _all_bed_build_and_refsrckeys(
         self, f: BuildDataToSrc
     ) -> list[tuple[RefKeyFullS, BuildKey]]:
-        return (
-            all_bed_build_and_refsrckeys(self.haploid_stratifications, f)
-            + all_bed_build_and_refsrckeys(self.diploid1_stratifications, f)
-            + all_bed_build_and_refsrckeys(self.diploid2_stratifications, f)
-        )
-
-    def _all_bed_refsrckeys(self, f: BuildDataToSrc) -> list[RefKeyFullS]:
-        return [rk for rk, _ in self._all_bed_build_and_refsrckeys(f)]
-
-    # @property
-    # def all_refkey_gap(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_gaps(bd)
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_rmsk(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_rmsk(bd)
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_simreps(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None,
-    #             bd_to_simreps(bd),
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_censat(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None,
-    #             bd_to_satellites(bd),
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_segdups(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None,
-    #             bd_to_superdups(bd),
-    #         )
-    #     )
+        # NOTE memoized on the identity of 'f', so callers should pass a named
+        # function and not a lambda
+        try:
+            return self._bed_build_and_refsrckeys_cache[f]
+        except KeyError:
+            h, d1, d2 = self._all_build_data
+            ks = self._bed_build_and_refsrckeys_cache[f] = (
+                all_bed_build_and_refsrckeys(h, f)
+                + all_bed_build_and_refsrckeys(d1, f)
+                + all_bed_build_and_refsrckeys(d2, f)
+            )
+            return ks
 
     @property
+    @_memo_property
     def all_buildkey_bench(self) -> list[tuple[RefKeyFullS, BuildKey]]:
-        return self._all_bed_build_and_refsrckeys(
-            lambda bd: fmap_maybe(
-                lambda x: x.bed.src if isinstance(x, BedFile) else None,
-                bd_to_bench_bed(bd),
-            )
-        )
-
-    # @property
-    # def all_refkey_cds(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_cds(bd)
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_mhc(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_mhc(bd)
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_kir(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_kir(bd)
-    #         )
-    #     )
-
-    # @property
-    # def all_refkey_vdj(self) -> list[RefKeyFullS]:
-    #     return self._all_bed_refsrckeys(
-    #         lambda bd: fmap_maybe(
-    #             lambda x: x.bed.src if isinstance(x, BedFile) else None, bd_to_vdj(bd)
-    #         )
-    #     )
+        return self._all_bed_build_and_refsrckeys(bd_to_bench_bed_src)
 
     # source and output functions
 
@@ -6016,15 +6383,22 @@ class GiabStrats(BaseModel):
         case and return False.
 
         """
-        return self.with_ref_data_full_rconf(
-            rk,
-            split,
-            nohap,
-            lambda _: False,
-            lambda _: True,
-            lambda _, __: True,
-            lambda _, __: False,
-        )
+        # NOTE errors are not memoized, so invalid combinations still throw
+        # every time
+        k = (rk, split, nohap)
+        try:
+            return self._is_dip1_cache[k]
+        except KeyError:
+            r = self._is_dip1_cache[k] = self.with_ref_data_full_rconf(
+                rk,
+                split,
+                nohap,
+                lambda _: False,
+                lambda _: True,
+                lambda _, __: True,
+                lambda _, __: False,
+            )
+            return r
 
     def refkey_strip_if_dip1(self, rk: RefKeyFullS, nohap: bool) -> RefKeyFullS:
         """Remove haplotype from refkey if dip1.
@@ -6065,70 +6439,152 @@ class GiabStrats(BaseModel):
         return max(n, len(self.buildkey_to_chrs(rk, bk, split, nohap)))
 
 
-################################################################################
-# protocols
+CONFIG_CACHE_ENV = "GIAB_STRATS_CONFIG_CACHE"
 
-# hacky rankN type mimicry
 
+def parse_config_cached(config: dict[str, Any]) -> GiabStrats:
+    """Parse the raw snakemake config, reusing the last parse if possible.
+
+    Validating the config is not cheap and snakemake does it every time the
+    Snakefile is evaluated. If the environment variable named by
+    CONFIG_CACHE_ENV is set to "1", pickle the result under the results
+    directory and reuse it as long as neither the config, the code defining it,
+    nor the python/pydantic versions have changed. Otherwise just parse.
 
-class RefDataToBed(Protocol):
-    A = TypeVar("A", HapBedSrc, DipBedSrc)
-    B = TypeVar("B", HapBedCoords, DipBedCoords)
+    NOTE validators are skipped on a cache hit, so anything they check on the
+    filesystem (ie FilePath) won't be rechecked (hence this being opt-in);
+    snakemake will complain about missing inputs anyways.
+    """
+    import hashlib
+    import logging
+    import os
+    import pickle
+    import tempfile
+    import pydantic
+
+    if os.environ.get(CONFIG_CACHE_ENV) != "1":
+        return GiabStrats.parse_obj(config)
+
+    logger = logging.getLogger(__name__)
+
+    # NOTE yaml allows keys of mixed types in one mapping, which json can't
+    # sort, so use each key's repr (which also keeps ie 1 and "1" distinct)
+    def canonical(x: Any) -> Any:
+        if isinstance(x, dict):
+            return {repr(k): canonical(v) for k, v in x.items()}
+        if isinstance(x, list):
+            return [canonical(v) for v in x]
+        return x
+
+    h = hashlib.sha256()
+    h.update(sys.version.encode())
+    h.update(str(pydantic.VERSION).encode())
+    h.update(json.dumps(canonical(config), sort_keys=True, default=str).encode())
+    for p in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(p.read_bytes())
+    digest = h.hexdigest()
+
+    paths = Paths.parse_obj(config.get("paths", {}))
+    cache = paths.results / ".cache" / "config.pkl"
+
+    if cache.exists():
+        try:
+            with open(cache, "rb") as f:
+                cached_digest, cached = pickle.load(f)
+            if cached_digest == digest and isinstance(cached, GiabStrats):
+                return cached
+            logger.info("config cache at %s is stale, reparsing", cache)
+        # anything else (ie a bug in the config code) should blow up
+        except (
+            OSError,
+            EOFError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            ImportError,
+            pickle.UnpicklingError,
+        ) as e:
+            logger.warning("discarding unreadable config cache at %s: %r", cache, e)
+
+    c = GiabStrats.parse_obj(config)
+
+    # write atomically since snakemake may evaluate the Snakefile in several
+    # processes at once
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache.parent)
+    try:
+        with os.fdopen(fd, "wb") as g:
+            pickle.dump((digest, c), g, protocol=5)
+        os.replace(tmp, cache)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
-    def __call__(
-        self, __x: RefData_[RefSrcT, A, VcfSrcT, B, BuildCompareT]
-    ) -> BedFile[A] | B | None:
-        pass
+    return c
 
 
-class RefDataToSrc(Protocol):
-    A = TypeVar("A", Single[BedSrc], Double[BedSrc])
+################################################################################
+# protocols
 
-    def __call__(
-        self, __x: RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
-    ) -> A | None:
-        pass
+# hacky rankN type mimicry
 
+# NOTE these only exist for mypy (they are only ever used in annotations, which
+# are never evaluated at runtime since we import annotations from __future__),
+# so don't bother making them on import
+if TYPE_CHECKING:
 
-class StratInputToBed(Protocol):
-    A = TypeVar("A", HapBedSrc, DipBedSrc)
-    B = TypeVar("B", HapBedCoords, DipBedCoords)
+    class RefDataToBed(Protocol):
+        A = TypeVar("A", HapBedSrc, DipBedSrc)
+        B = TypeVar("B", HapBedCoords, DipBedCoords)
 
-    def __call__(self, __x: StratInputs[A, B]) -> BedFile[A] | B | None:
-        pass
+        def __call__(
+            self, __x: RefData_[RefSrcT, A, VcfSrcT, B, BuildCompareT]
+        ) -> BedFile[A] | B | None:
+            pass
 
+    class RefDataToSrc(Protocol):
+        A = TypeVar("A", Single[BedSrc], Double[BedSrc])
 
-# TODO not sure how to get manual text through this
-class StratInputToSrc(Protocol):
-    A = TypeVar("A", Single[BedSrc], Double[BedSrc])
+        def __call__(
+            self, __x: RefData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
+        ) -> A | None:
+            pass
 
-    def __call__(self, __x: StratInputs[BedSrcT, BedCoordsT]) -> A | None:
-        pass
+    class StratInputToBed(Protocol):
+        A = TypeVar("A", HapBedSrc, DipBedSrc)
+        B = TypeVar("B", HapBedCoords, DipBedCoords)
 
+        def __call__(self, __x: StratInputs[A, B]) -> BedFile[A] | B | None:
+            pass
 
-class BuildDataToBed(Protocol):
-    A = TypeVar("A", HapBedSrc, DipBedSrc)
-    B = TypeVar("B", HapBedCoords, DipBedCoords)
+    # TODO not sure how to get manual text through this
+    class StratInputToSrc(Protocol):
+        A = TypeVar("A", Single[BedSrc], Double[BedSrc])
 
-    def __call__(
-        self, __x: BuildData_[RefSrcT, A, VcfSrcT, B, BuildCompareT]
-    ) -> BedFile[A] | B | None:
-        pass
+        def __call__(self, __x: StratInputs[BedSrcT, BedCoordsT]) -> A | None:
+            pass
 
+    class BuildDataToBed(Protocol):
+        A = TypeVar("A", HapBedSrc, DipBedSrc)
+        B = TypeVar("B", HapBedCoords, DipBedCoords)
 
-class BuildDataToVCF(Protocol):
-    A = TypeVar("A", HapVcfSrc, Dip1VcfSrc, Dip2VcfSrc)
+        def __call__(
+            self, __x: BuildData_[RefSrcT, A, VcfSrcT, B, BuildCompareT]
+        ) -> BedFile[A] | B | None:
+            pass
 
-    def __call__(
-        self, __x: BuildData_[RefSrcT, BedSrcT, A, BedCoordsT, BuildCompareT]
-    ) -> VCFFile[A] | None:
-        pass
+    class BuildDataToVCF(Protocol):
+        A = TypeVar("A", HapVcfSrc, Dip1VcfSrc, Dip2VcfSrc)
 
+        def __call__(
+            self, __x: BuildData_[RefSrcT, BedSrcT, A, BedCoordsT, BuildCompareT]
+        ) -> VCFFile[A] | None:
+            pass
 
-class BuildDataToSrc(Protocol):
-    A = TypeVar("A", Single[BedSrc], Double[BedSrc])
+    class BuildDataToSrc(Protocol):
+        A = TypeVar("A", Single[BedSrc], Double[BedSrc])
 
-    def __call__(
-        self, __x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
-    ) -> A | None:
-        pass
+        def __call__(
+            self, __x: BuildData_[RefSrcT, BedSrcT, VcfSrcT, BedCoordsT, BuildCompareT]
+        ) -> A | None:
+            pass
@@ -1,3 +1,4 @@
+from __future__ import annotations
 from pathlib import Path
 import jinja2 as j2
 from typing import Any